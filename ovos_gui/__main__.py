@@ -1,7 +1,10 @@
+import asyncio
+
 from ovos_config.locale import setup_locale
 from ovos_utils import wait_for_exit_signal
 from ovos_utils.log import LOG, init_service_logger
 from ovos_utils.process_utils import reset_sigint_handler, PIDLock
+from tornado.platform.asyncio import AsyncIOMainLoop
 
 from ovos_gui.service import GUIService
 
@@ -18,6 +21,25 @@ def on_error(e='Unknown'):
     LOG.error(f'GUI websocket failed: {repr(e)}')
 
 
+def install_uvloop() -> bool:
+    """
+    Use uvloop for the GUI websocket event loop, if installed. Only the
+    event loop of the calling thread is replaced, the process wide event
+    loop policy is left as is.
+    @return: True if the GUI websocket will run on uvloop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    loop = uvloop.new_event_loop()
+    asyncio.set_event_loop(loop)
+    # tornado's IOLoop.current() in this thread now runs on this loop
+    AsyncIOMainLoop()
+    LOG.debug("Using uvloop event loop")
+    return True
+
+
 def main(ready_hook=on_ready, error_hook=on_error, stopping_hook=on_stopping):
     PIDLock.init()
     reset_sigint_handler()
@@ -26,6 +48,8 @@ def main(ready_hook=on_ready, error_hook=on_error, stopping_hook=on_stopping):
     LOG.debug("GUI websocket created")
     try:
         setup_locale()
+        # must happen before the GUI websocket looks up its event loop
+        install_uvloop()
         service = GUIService()
         service.run()
         ready_hook()
@@ -25,21 +25,99 @@ If the connection is lost, it must be renegotiated and restarted.
 """
 import asyncio
 import json
-from threading import Lock
-from typing import List
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple, Union
 
-from ovos_bus_client import Message, GUIMessage
+from ovos_bus_client import Message
 from ovos_config.config import Configuration
 from ovos_gui.page import GuiPage
+from ovos_gui.utils import is_debug_enabled
 from ovos_utils import create_daemon
 from ovos_utils.log import LOG
 from tornado import ioloop
 from tornado.options import parse_command_line
 from tornado.web import Application
-from tornado.websocket import WebSocketHandler
-# from ovos_gui.namespace import NamespaceManager
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
 
-_write_lock = Lock()
+try:
+    import orjson
+except ImportError:  # optional speedup, see requirements/extras.txt
+    orjson = None
+
+
+# pre-serialized `mycroft.gui.list.insert` message, the pages are spliced in
+_PAGES_INSERT_TEMPLATE = b'{"type":"mycroft.gui.list.insert",' \
+                         b'"namespace":%s,"position":%d,"data":%s}'
+
+
+def serialize_message(data: dict) -> bytes:
+    """
+    Serialize a GUI protocol message to UTF-8 encoded JSON
+    @param data: dict message to serialize
+    @return: bytes JSON payload, ready to be written to a websocket
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def _deserialize(message: Union[str, bytes]) -> Tuple[str, dict]:
+    """
+    Parse a GUI protocol message, using orjson when available
+    @param message: serialized message received from a GUI client, bytes if
+        it was sent as a binary frame
+    @return: message type and message data (all other top level keys)
+    """
+    # encrypted messages need to go through ovos_bus_client
+    if orjson is not None and not getattr(Message, "_secret_key", None):
+        data = orjson.loads(message)
+    else:
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        data = Message._json_load(message)
+    return data.pop("type"), data
+
+
+# GUI framework of each mycroft-gui `qt_version`, other versions use qt5
+_QT_FRAMEWORKS = {5: "qt5", 6: "qt6", "5": "qt5", "6": "qt6"}
+
+
+def get_qt_framework(qt_version: Union[int, str]) -> str:
+    """
+    Get the GUI framework for a mycroft-gui `qt_version`
+    @param qt_version: Qt major version, as int or str
+    @return: GUI framework name
+    """
+    framework = _QT_FRAMEWORKS.get(qt_version)
+    if framework is None:
+        framework = _QT_FRAMEWORKS.get(int(qt_version), "qt5")
+    return framework
+
+
+# framework of clients that don't report one, read from config on first use
+_default_framework: Optional[str] = None
+
+
+def _get_default_framework() -> str:
+    """
+    Get the GUI framework configured for clients not reporting a framework
+    """
+    global _default_framework
+    if _default_framework is None:
+        qt = Configuration().get('gui', {}).get('default_qt_version') or 5
+        _default_framework = get_qt_framework(qt)
+    return _default_framework
+
+
+def _reset_default_framework(message: Optional[Message] = None):
+    """
+    Re-read the default GUI framework from config on next use
+    @param message: configuration change Message, None for file changes
+    """
+    global _default_framework
+    _default_framework = None
 
 
 def get_gui_websocket_config() -> dict:
@@ -68,24 +146,116 @@ def create_gui_service(nsmanager=None) -> Application:
         websocket_config['base_port'], websocket_config['host']
     )
 
+    if nsmanager is not None:
+        for msg_type in ("configuration.updated", "configuration.patch",
+                         "configuration.patch.clear"):
+            nsmanager.core_bus.on(msg_type, _reset_default_framework)
+    # config files edited on disk are reloaded without a bus message
+    Configuration.set_config_watcher(_reset_default_framework)
+
     create_daemon(ioloop.IOLoop.instance().start)
     LOG.info('GUI Message bus started!')
     return application
 
 
+# messages collected by `gui_batch` in the current thread
+_batch = threading.local()
+
+
+@contextmanager
+def gui_batch():
+    """
+    Collect messages sent to GUI clients from the current thread and hand
+    them to each client at once when the outermost batch exits. Messages are
+    still sent one by one, in order, but each client is woken up only once
+    per batch instead of once per message.
+    """
+    if getattr(_batch, "frames", None) is not None:
+        # nested batch, the outermost one sends
+        yield
+        return
+    frames = _batch.frames = []
+    try:
+        yield
+    finally:
+        _batch.frames = None
+        if frames:
+            _send_frames(frames)
+
+
+def _send_frames(frames: List[Tuple[Optional["GUIWebsocketHandler"], bytes]]):
+    """
+    Send messages collected by `gui_batch`
+    @param frames: list of (target client or None for all clients, payload)
+    """
+    for connection in get_gui_clients():
+        payloads = [payload for target, payload in frames
+                    if target is None or target is connection]
+        if not payloads:
+            continue
+        try:
+            connection.send_batch(payloads)
+        except Exception as e:
+            LOG.exception(repr(e))
+
+
 def send_message_to_gui(message: dict):
     """
     Sends the supplied message to all connected GUI clients. This function does
     NOT account for the GUI framework in use by each client
     @param message: dict data to send to GUI clients
     """
-    for connection in GUIWebsocketHandler.clients:
+    if not GUIWebsocketHandler.clients:
+        return
+    # serialize once, every client receives the same payload
+    payload = serialize_message(message)
+    frames = getattr(_batch, "frames", None)
+    if frames is not None:
+        frames.append((None, payload))
+        return
+    for connection in get_gui_clients():
         try:
-            connection.send(message)
+            connection.send_raw(payload)
         except Exception as e:
             LOG.exception(repr(e))
 
 
+def serialize_pages(pages: List[GuiPage], framework: str) -> bytes:
+    """
+    Serialize GUI pages as the `data` of a `mycroft.gui.list.insert` message
+    @param pages: list of GuiPage objects to send
+    @param framework: GUI framework to resolve page URIs for
+    @return: UTF-8 encoded JSON list of pages
+    """
+    # if uri (path) can not be resolved, it might exist client side
+    # if path doesn't exist in client side, client is responsible for
+    # resolving page by namespace/name
+    return serialize_message([{"url": page.get_uri(framework),
+                               "page": page.name} for page in pages])
+
+
+def build_pages_payload(pages_data: bytes, namespace: str,
+                        position: int) -> bytes:
+    """
+    Build a serialized message inserting GUI pages in a namespace
+    @param pages_data: pages serialized with `serialize_pages`
+    @param namespace: namespace to put GuiPages in
+    @param position: position to insert pages at
+    @return: UTF-8 encoded `mycroft.gui.list.insert` message
+    """
+    return _PAGES_INSERT_TEMPLATE % (serialize_message(namespace),
+                                     position, pages_data)
+
+
+def get_gui_clients() -> List["GUIWebsocketHandler"]:
+    """
+    Get a snapshot of the connected GUI clients, safe to iterate while
+    clients connect and disconnect on the IOLoop thread.
+    """
+    with GUIWebsocketHandler.clients_lock:
+        return list(GUIWebsocketHandler.clients)
+
+
 def determine_if_gui_connected() -> bool:
     """
     Returns True if any clients are connected to the GUI bus.
@@ -95,12 +265,31 @@ def determine_if_gui_connected() -> bool:
 
 class GUIWebsocketHandler(WebSocketHandler):
     """Defines the websocket pipeline between the GUI and Mycroft."""
-    clients = []
+    # connected clients, changed on the IOLoop thread while bus handlers
+    # broadcast; hold `clients_lock` to change it, see `get_gui_clients`
+    clients: Set["GUIWebsocketHandler"] = set()
+    clients_lock = threading.Lock()
+    # max number of outgoing messages buffered for a single client before
+    # it is considered unresponsive and disconnected
+    max_queue_size = 256
+    # seconds writing a burst of queued messages may take before the client
+    # is disconnected
+    write_timeout = 5
 
     def __init__(self, *args, **kwargs):
         WebSocketHandler.__init__(self, *args, **kwargs)
         self._framework = "qt5"
         self.ns_manager = self.application.settings.get("namespace_manager")
+        self._loop = None
+        self._queue = None
+        self._relay = None
+        # set once the connection closed, messages are dropped from then on
+        self._closed = False
+        # messages handed over by other threads, moved to `_queue` by a
+        # single event loop callback
+        self._pending: List[bytes] = list()
+        self._flush_scheduled = False
+        self._pending_lock = threading.Lock()
 
     @property
     def framework(self) -> str:
@@ -113,7 +302,13 @@ class GUIWebsocketHandler(WebSocketHandler):
         """
         Add a new connection to `clients` and synchronize
         """
-        GUIWebsocketHandler.clients.append(self)
+        # outgoing messages are queued per client and written by a relay
+        # task, a slow client can not delay messages to the other clients
+        self._loop = asyncio.get_event_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._relay = asyncio.ensure_future(self._drain())
+        with GUIWebsocketHandler.clients_lock:
+            GUIWebsocketHandler.clients.add(self)
         LOG.info('New Connection opened!')
         self.synchronize()
 
@@ -121,122 +316,63 @@ class GUIWebsocketHandler(WebSocketHandler):
         """
         Remove a closed connection from `clients`
         """
-        LOG.info('Closing {}'.format(id(self)))
-        GUIWebsocketHandler.clients.remove(self)
+        LOG.debug('Closing %s', id(self))
+        self._closed = True
+        with GUIWebsocketHandler.clients_lock:
+            GUIWebsocketHandler.clients.discard(self)
+        if self._relay is not None:
+            self._relay.cancel()
 
     def synchronize(self):
         """
         Upload namespaces, pages and data to the last connected client.
         """
-        namespace_pos = 0
-
-        for namespace in self.ns_manager.active_namespaces:
-            LOG.info(f'Sync {namespace.skill_id}')
+        framework = self.framework
+        for namespace_pos, namespace in \
+                enumerate(self.ns_manager.active_namespaces):
+            LOG.info('Sync %s', namespace.skill_id)
             # Insert namespace
             self.send({"type": "mycroft.session.list.insert",
                        "namespace": "mycroft.system.active_skills",
                        "position": namespace_pos,
                        "data": [{"skill_id": namespace.skill_id}]
                        })
-            # Insert pages
-            # if uri (path) can not be resolved, it might exist client side
-            # if path doesn't exist in client side, client is responsible for resolving page by namespace/name
-            self.send({"type": "mycroft.gui.list.insert",
-                       "namespace": namespace.skill_id,
-                       "position": 0,
-                       "data": [{"url": page.get_uri(self.framework), "page": page.name}
-                                for page in namespace.pages]
-                       })
-            # Insert data
-            for key, value in namespace.data.items():
-                self.send({"type": "mycroft.session.set",
-                           "namespace": namespace.skill_id,
-                           "data": {key: value}
-                           })
-            namespace_pos += 1
-
-    def on_message(self, message: str):
+            # Insert pages and data
+            for frame in namespace.get_sync_frames(framework):
+                self.send_raw(frame)
+
+    def on_message(self, message: Union[str, bytes]):
         """
         Handle a message on the GUI websocket. Deserialize the message, map
         message types to valid equivalents for the core messagebus and emit
         on the core messagebus.
+        Clients may send messages as binary frames containing UTF-8 encoded
+        JSON, these are parsed without being decoded to `str` first.
         @param message: Serialized Message
         """
-        LOG.debug(f"Received: {message}")
-        parsed_message = GUIMessage.deserialize(message)
-        LOG.debug(f"Received: {parsed_message.msg_type}|{parsed_message.data}")
-
-        # msg = json.loads(message)
-        if parsed_message.msg_type == "mycroft.events.triggered" and \
-                (parsed_message.data.get('event_name') == 'page_gained_focus' or
-                 parsed_message.data.get('event_name') ==
-                 'system.gui.user.interaction'):
-            # System event, a page was changed
-            event_name = parsed_message.data.get('event_name')
-            if event_name == 'page_gained_focus':
-                msg_type = 'gui.page_gained_focus'
-            else:
-                msg_type = 'gui.page_interaction'
-
-            msg_data = \
-                {'namespace': parsed_message.data['namespace'],
-                 'page_number': parsed_message.data['parameters'].get('number'),
-                 'skill_id': parsed_message.data['parameters'].get('skillId')}
-        elif parsed_message.msg_type == "mycroft.events.triggered":
-            # A normal event was triggered
-            msg_type = f"{parsed_message.data['namespace']}." \
-                       f"{parsed_message.data['event_name']}"
-            msg_data = parsed_message.data['parameters']
-
-        elif parsed_message.msg_type == 'mycroft.session.set':
-            # A value was changed send it back to the skill
-            msg_type = f"{parsed_message.data['namespace']}.set"
-            msg_data = parsed_message.data['data']
-        elif parsed_message.msg_type == 'mycroft.gui.connected':
-            # new client connected to GUI
-
-            # NOTE: mycroft-gui clients do this directly in core bus, don't
-            # send it to gui bus. In those cases, framework is read from config,
-            # defaulting to qt5 for backwards-compat.
-            default_qt_version = \
-                Configuration().get('gui', {}).get('default_qt_version') or 5
-            msg_type = parsed_message.msg_type
-            msg_data = parsed_message.data
-
-            framework = msg_data.get("framework")  # new api
-            if framework is None:
-                # mycroft-gui api
-                qt = msg_data.get("qt_version") or default_qt_version
-                if int(qt) == 6:
-                    framework = "qt6"
-                else:
-                    framework = "qt5"
-
-            self._framework = framework
-        else:
+        debug = is_debug_enabled()
+        if debug:
+            LOG.debug("Received: %s", message)
+        msg_type, msg_data = _deserialize(message)
+        if debug:
+            LOG.debug("Received: %s|%s", msg_type, msg_data)
+
+        handler = _MESSAGE_HANDLERS.get(msg_type)
+        if handler is None:
             # message not in spec
             # https://github.com/MycroftAI/mycroft-gui/blob/master/transportProtocol.md
             LOG.error(f"unknown GUI protocol message type, ignoring: "
-                      f"{parsed_message.msg_type}")
+                      f"{msg_type}")
             return
+        msg_type, msg_data = handler(self, msg_type, msg_data)
 
-        parsed_message.context["gui_framework"] = self.framework
-        message = Message(msg_type, msg_data, parsed_message.context)
-        LOG.debug('Forwarding to core bus...')
+        message = Message(msg_type, msg_data,
+                          {"gui_framework": self.framework})
+        if debug:
+            LOG.debug('Forwarding to core bus...')
         self.ns_manager.core_bus.emit(message)
-        LOG.debug('Done!')
-
-    def write_message(self, *arg, **kwarg):
-        """
-        Wraps WebSocketHandler.write_message() with a lock.
-        """
-        try:
-            asyncio.get_event_loop()
-        except RuntimeError:
-            asyncio.set_event_loop(asyncio.new_event_loop())
-
-        with _write_lock:
-            super().write_message(*arg, **kwarg)
+        if debug:
+            LOG.debug('Done!')
 
     def send_gui_pages(self, pages: List[GuiPage], namespace: str,
                        position: int):
@@ -246,29 +382,223 @@ class GUIWebsocketHandler(WebSocketHandler):
         @param namespace: namespace to put GuiPages in
         @param position: position to insert pages at
         """
-        framework = self.framework
-        # if uri (path) can not be resolved, it might exist client side
-        # if path doesn't exist in client side, client is responsible for resolving page by namespace/name
-        message = {
-            "type": "mycroft.gui.list.insert",
-            "namespace": namespace,
-            "position": position,
-            "data": [{"url": page.get_uri(framework), "page": page.name}
-                     for page in pages]
-        }
-        LOG.debug(f"Showing pages: {message['data']}")
-        self.send(message)
+        pages_data = serialize_pages(pages, self.framework)
+        if is_debug_enabled():
+            LOG.debug("Showing pages: %s", pages_data)
+        self.send_raw(build_pages_payload(pages_data, namespace, position))
 
     def send(self, data: dict):
         """
         Send the given data across the socket as JSON
         @param data: Data to send to the GUI
         """
-        s = json.dumps(data)
-        self.write_message(s)
+        self.send_raw(serialize_message(data))
+
+    def send_raw(self, payload: bytes):
+        """
+        Queue an already serialized JSON message to be sent across the socket.
+        This method may be called from any thread.
+        @param payload: UTF-8 encoded JSON message to send to the GUI
+        """
+        frames = getattr(_batch, "frames", None)
+        if frames is not None:
+            frames.append((self, payload))
+            return
+        if self._loop is None:
+            LOG.warning(f"Connection {id(self)} is not open, dropping message")
+            return
+        if self._closed:
+            # nothing drains the queue of a closed connection anymore
+            return
+        self._schedule((payload,))
+
+    def send_batch(self, payloads: List[bytes]):
+        """
+        Queue several serialized JSON messages to be sent across the socket,
+        in order, with a single event loop wakeup.
+        This method may be called from any thread.
+        @param payloads: UTF-8 encoded JSON messages to send to the GUI
+        """
+        if self._loop is None:
+            LOG.warning(f"Connection {id(self)} is not open, dropping "
+                        f"{len(payloads)} messages")
+            return
+        if self._closed:
+            return
+        self._schedule(payloads)
+
+    def _schedule(self, payloads):
+        """
+        Hand messages over to the event loop. Only the first message since the
+        last flush wakes the loop up, messages sent in a burst are moved to
+        the outgoing queue together, so a busy loop is not woken up again
+        for every message.
+        @param payloads: UTF-8 encoded JSON messages to send to the GUI
+        """
+        with self._pending_lock:
+            self._pending.extend(payloads)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._loop.call_soon_threadsafe(self._flush_pending)
+
+    def _flush_pending(self):
+        """
+        Move messages handed over by `_schedule` to the outgoing queue, runs
+        in the event loop.
+        """
+        with self._pending_lock:
+            payloads = self._pending
+            self._pending = list()
+            self._flush_scheduled = False
+        if not self._closed:
+            self._enqueue(*payloads)
+
+    def _enqueue(self, *payloads: bytes):
+        """
+        Add messages to the outgoing queue, runs in the event loop.
+        Clients that stop consuming messages are disconnected, they will
+        be synchronized again when they reconnect.
+        @param payloads: UTF-8 encoded JSON messages to send to the GUI
+        """
+        try:
+            for payload in payloads:
+                self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            LOG.error(f"Connection {id(self)} is not consuming messages, "
+                      f"closing it")
+            self.close()
+
+    async def _drain(self):
+        """
+        Relay task writing queued messages to the socket. All messages queued
+        when the relay wakes up are written to the stream buffer together and
+        flushed once, instead of waiting for each message to be flushed.
+        Each client has its own relay, so a broadcast is written to all
+        clients concurrently and a stalled client only delays itself.
+        """
+        queue = self._queue
+        while True:
+            payloads = [await queue.get()]
+            while not queue.empty():
+                payloads.append(queue.get_nowait())
+            try:
+                writes = list()
+                for payload in payloads:
+                    writes.append(super().write_message(payload))
+                # failed writes are returned instead of raised, so no write
+                # is left with an exception nobody retrieves
+                results = await asyncio.wait_for(
+                    asyncio.gather(*writes, return_exceptions=True),
+                    self.write_timeout)
+            except WebSocketClosedError:
+                return
+            except asyncio.TimeoutError:
+                LOG.error(f"Connection {id(self)} timed out, closing it")
+                self.close()
+                return
+            for result in results:
+                if isinstance(result, WebSocketClosedError):
+                    return
+                if isinstance(result, BaseException):
+                    LOG.error(f"Connection {id(self)} failed to write: "
+                              f"{result!r}, closing it")
+                    self.close()
+                    return
 
     def check_origin(self, origin):
         """
         Override origin check to make js connections work.
         """
         return True
+
+
+# GUI system events, forwarded to the core bus with a dedicated type
+_SYSTEM_EVENTS = {
+    "page_gained_focus": "gui.page_gained_focus",
+    "system.gui.user.interaction": "gui.page_interaction"
+}
+
+
+@lru_cache(maxsize=1024)
+def _event_msg_type(namespace: str, event_name: str) -> str:
+    """
+    Get the core bus message type of an event triggered in a GUI namespace
+    """
+    return f"{namespace}.{event_name}"
+
+
+@lru_cache(maxsize=512)
+def _set_msg_type(namespace: str) -> str:
+    """
+    Get the core bus message type of a value set in a GUI namespace
+    """
+    return f"{namespace}.set"
+
+
+def _handle_event_triggered(client: GUIWebsocketHandler, msg_type: str,
+                            data: dict) -> Tuple[str, dict]:
+    """
+    Map a `mycroft.events.triggered` GUI message to a core bus message
+    @param client: connection the message was received from
+    @param msg_type: GUI message type
+    @param data: GUI message data
+    @return: core bus message type and data
+    """
+    event_name = data.get('event_name')
+    system_msg_type = _SYSTEM_EVENTS.get(event_name)
+    if system_msg_type is not None:
+        # System event, a page was changed
+        parameters = data['parameters']
+        return system_msg_type, {'namespace': data['namespace'],
+                                 'page_number': parameters.get('number'),
+                                 'skill_id': parameters.get('skillId')}
+    # A normal event was triggered
+    return _event_msg_type(data['namespace'], event_name), \
+        data['parameters']
+
+
+def _handle_session_set(client: GUIWebsocketHandler, msg_type: str,
+                        data: dict) -> Tuple[str, dict]:
+    """
+    Map a `mycroft.session.set` GUI message to a core bus message, a value
+    was changed send it back to the skill
+    @param client: connection the message was received from
+    @param msg_type: GUI message type
+    @param data: GUI message data
+    @return: core bus message type and data
+    """
+    return _set_msg_type(data['namespace']), data['data']
+
+
+def _handle_gui_connected(client: GUIWebsocketHandler, msg_type: str,
+                          data: dict) -> Tuple[str, dict]:
+    """
+    Handle a `mycroft.gui.connected` GUI message, a new client connected to
+    the GUI and reported the framework it uses
+    @param client: connection the message was received from
+    @param msg_type: GUI message type
+    @param data: GUI message data
+    @return: core bus message type and data
+    """
+    # NOTE: mycroft-gui clients do this directly in core bus, don't
+    # send it to gui bus. In those cases, framework is read from config,
+    # defaulting to qt5 for backwards-compat.
+    framework = data.get("framework")  # new api
+    if framework is None:
+        # mycroft-gui api
+        qt = data.get("qt_version")
+        if not qt:
+            framework = _get_default_framework()
+        else:
+            framework = get_qt_framework(qt)
+
+    client._framework = framework
+    return msg_type, data
+
+
+_MESSAGE_HANDLERS = {
+    "mycroft.events.triggered": _handle_event_triggered,
+    "mycroft.session.set": _handle_session_set,
+    "mycroft.gui.connected": _handle_gui_connected
+}
@@ -1,10 +1,43 @@
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
 from ovos_bus_client import Message, MessageBusClient
 from ovos_config.config import Configuration
 from ovos_utils.log import LOG
-from ovos_plugin_manager.gui import OVOSGuiFactory
 from ovos_gui.homescreen import HomescreenManager
 
 
+# legacy extension names and the GUI plugins replacing them
+_EXTENSION_PLUGINS = {
+    "smartspeaker": "ovos-gui-plugin-shell-companion",
+    "bigscreen": "ovos-gui-plugin-bigscreen",
+    "mobile": "ovos-gui-plugin-mobile",
+    "plasmoid": "ovos-gui-plugin-plasmoid"
+}
+
+
+class ExtensionMeta(NamedTuple):
+    """
+    Behaviour flags of the active GUI extension, read once on activation
+    """
+    preload_gui: bool
+    permanent: bool
+
+
+@lru_cache(maxsize=8)
+def _get_plugin_class(module: str) -> type:
+    """
+    Get the GUI plugin class for a module, the installed plugins don't change
+    while running, so entry points are only looked up once per module
+    @param module: GUI Plugin entrypoint
+    @return: uninstantiated GUIExtension class
+    """
+    # plugin manager is imported when the first extension is activated, it
+    # loads every plugin template and is slow to import
+    from ovos_plugin_manager.gui import OVOSGuiFactory
+    return OVOSGuiFactory.get_class({"module": module})
+
+
 class ExtensionsManager:
     def __init__(self, name: str, bus: MessageBusClient):
         """
@@ -17,9 +50,16 @@ class ExtensionsManager:
 
         self.name = name
         self.bus = bus
+        self.extension = None
+        self.extension_meta: Optional[ExtensionMeta] = None
+        self._available_signaled = False
+        # bus handlers registered for the active extension
+        self._bus_handlers: List[Tuple[str, Callable]] = []
         self.homescreen_manager = HomescreenManager(self.bus)
         core_config = Configuration()
         enclosure_config = core_config.get("gui") or {}
+        # read once, passed on to the plugin of the activated extension
+        self._gui_config = enclosure_config
         self.active_extension = enclosure_config.get("extension", "generic")
         LOG.debug(f"Extensions Manager: Initializing {self.name} "
                   f"with active extension {self.active_extension}")
@@ -30,45 +70,109 @@ class ExtensionsManager:
         Activate the requested extension
         @param extension_id: GUI Plugin entrypoint to activate
         """
-        mappings = {
-            "smartspeaker": "ovos-gui-plugin-shell-companion",
-            "bigscreen": "ovos-gui-plugin-bigscreen",
-            "mobile": "ovos-gui-plugin-mobile",
-            "plasmoid": "ovos-gui-plugin-plasmoid"
-        }
-        if extension_id.lower() in mappings:
-            extension_id = mappings[extension_id.lower()]
+        extension_id = _EXTENSION_PLUGINS.get(extension_id.lower(),
+                                              extension_id)
+        self._release_extension()
 
-        cfg = dict(Configuration().get("gui", {}))
+        cfg = dict(self._gui_config)
         cfg["module"] = extension_id
         # LOG.info(f"Extensions Manager: Activating Extension {extension_id}")
         try:
             LOG.info(f"Creating GUI with config={cfg}")
-            self.extension = OVOSGuiFactory.create(cfg, bus=self.bus)
+            self.extension = self._create_extension(cfg)
         except:
             if extension_id == "generic":
                 raise
             LOG.exception(f"failed to load {extension_id}, "
                           f"falling back to 'generic'")
             cfg["module"] = "generic"
-            self.extension = OVOSGuiFactory.create(cfg, bus=self.bus)
+            self.extension = self._create_extension(cfg)
 
         self.extension.bind_homescreen(self.homescreen_manager)
+        self.extension_meta = ExtensionMeta(
+            preload_gui=bool(self.extension.preload_gui),
+            permanent=bool(self.extension.permanent))
 
         LOG.info(f"Extensions Manager - Activated: {extension_id} "
                  f"({self.extension.__class__.__name__})")
         self.bus.emit(
             Message("extension.manager.activated", {"id": extension_id}))
 
-        def signal_available(message=None):
-            message = message or Message("")
-            self.bus.emit(
-                message.forward("mycroft.gui.available",
-                                {"permanent": self.extension.permanent}))
-
-        if self.extension.preload_gui:
-            signal_available()
+        if self.extension_meta.preload_gui:
+            self.signal_available()
         else:
-            self.bus.on("mycroft.gui.connected", signal_available)
+            self._register_bus_handler("mycroft.gui.connected",
+                                       self.signal_available)
+
+    def signal_available(self, message: Optional[Message] = None):
+        """
+        Announce the GUI of the active extension is available
+        @param message: optional `mycroft.gui.connected` Message
+        """
+        # announced once per activation, later connections are not new
+        if self._available_signaled:
+            return
+        self._available_signaled = True
+        self._remove_bus_handler("mycroft.gui.connected",
+                                 self.signal_available)
+        message = message or Message("")
+        self.bus.emit(
+            message.forward("mycroft.gui.available",
+                            {"permanent": self.extension_meta.permanent}))
+
+    def _register_bus_handler(self, msg_type: str, handler: Callable):
+        """
+        Register a bus handler that is removed when the extension is replaced
+        @param msg_type: message type to handle
+        @param handler: handler method
+        """
+        self.bus.on(msg_type, handler)
+        self._bus_handlers.append((msg_type, handler))
 
+    def _remove_bus_handler(self, msg_type: str, handler: Callable):
+        """
+        Remove a bus handler registered with `_register_bus_handler`
+        @param msg_type: message type handled
+        @param handler: handler method
+        """
+        try:
+            self._bus_handlers.remove((msg_type, handler))
+        except ValueError:
+            return
+        self.bus.remove(msg_type, handler)
 
+    def _release_extension(self):
+        """
+        Remove the bus handlers registered for the active extension and shut
+        it down, before another extension is activated
+        """
+        for msg_type, handler in self._bus_handlers:
+            self.bus.remove(msg_type, handler)
+        self._bus_handlers = []
+        self._available_signaled = False
+        shutdown = getattr(self.extension, "shutdown", None)
+        if callable(shutdown):
+            try:
+                shutdown()
+            except Exception as e:
+                LOG.exception(f"Failed to shutdown extension: {e}")
+        self.extension = None
+        self.extension_meta = None
+
+    def shutdown(self):
+        """
+        Shutdown the active extension and the homescreen manager
+        """
+        self._release_extension()
+        self.homescreen_manager.shutdown()
+
+    def _create_extension(self, cfg: dict):
+        """
+        Instantiate the GUI plugin configured in `cfg["module"]`
+        @param cfg: gui configuration
+        @return: GUIExtension instance
+        """
+        from ovos_plugin_manager.gui import get_gui_config
+        gui_config = get_gui_config(cfg)
+        clazz = _get_plugin_class(gui_config.get("module") or "generic")
+        return clazz(gui_config, bus=self.bus)
@@ -1,33 +1,129 @@
-from threading import Thread
-from typing import List, Optional
+from threading import Lock, Timer
+from typing import Callable, Dict, Optional, Set
 
 from ovos_config.config import Configuration, update_mycroft_config
 from ovos_utils.log import LOG, log_deprecation
 
 from ovos_bus_client import Message, MessageBusClient
 from ovos_bus_client.message import dig_for_message
+from ovos_gui.utils import is_debug_enabled
 
 
-class HomescreenManager(Thread):
+# marks the configured homescreen as not read from config yet
+_NOT_LOADED = object()
+
+
+class HomescreenManager:
+    # seconds to collect homescreen registrations before checking if one of
+    # them should be displayed, skills register at once on reload
+    add_debounce = 0.25
+    # seconds to collect display requests, so back-to-back requests result
+    # in a single `homescreen.manager.activate.display`
+    activate_debounce = 0.05
+
     def __init__(self, bus: MessageBusClient):
-        super().__init__()
+        """
+        Tracks registered homescreens and handles homescreen.manager bus
+        requests.
+        @param bus: MessageBus instance
+        """
         self.bus = bus
-        self.homescreens: List[dict] = []
+        # registered homescreens by id
+        self.homescreens: Dict[str, dict] = dict()
+        # configured `idle_display_skill`, read on first use
+        self._idle_display_skill = _NOT_LOADED
+        # last active homescreen logged at info level
+        self._logged_active_homescreen: Optional[str] = None
+        # homescreens added since the last display check
+        self._pending_adds: Set[str] = set()
+        self._add_timer: Optional[Timer] = None
+        self._add_lock = Lock()
+        # latest display request not emitted yet
+        self._pending_activation: Optional[Message] = None
+        self._activation_timer: Optional[Timer] = None
+        self._activation_lock = Lock()
 
-        self.bus.on('homescreen.manager.add', self.add_homescreen)
-        self.bus.on('homescreen.manager.remove', self.remove_homescreen)
-        self.bus.on('homescreen.manager.list', self.get_homescreens)
-        self.bus.on("homescreen.manager.get_active", self.handle_get_active_homescreen)
-        self.bus.on("homescreen.manager.set_active", self.handle_set_active_homescreen)
-        self.bus.on("homescreen.manager.disable_active", self.disable_active_homescreen)
-        self.bus.on("homescreen.manager.show_active", self.show_homescreen)
+        # bound once, so the same handlers can be removed on shutdown
+        self._bus_handlers: Dict[str, Callable[[Message], None]] = {
+            "homescreen.manager.add": self.add_homescreen,
+            "homescreen.manager.remove": self.remove_homescreen,
+            "homescreen.manager.list": self.get_homescreens,
+            "homescreen.manager.get_active": self.handle_get_active_homescreen,
+            "homescreen.manager.set_active": self.handle_set_active_homescreen,
+            "homescreen.manager.disable_active": self.disable_active_homescreen,
+            "homescreen.manager.show_active": self.show_homescreen,
+            "configuration.updated": self.handle_config_updated,
+            "configuration.patch": self.handle_config_patch,
+            "configuration.patch.clear": self.handle_config_updated
+        }
+        for msg_type, handler in self._bus_handlers.items():
+            self.bus.on(msg_type, handler)
+        # config files edited on disk are reloaded without a bus message
+        Configuration.set_config_watcher(self.handle_config_updated)
 
     def run(self):
         """
         Start the Manager after it has been constructed.
         """
         self.reload_homescreens_list()
-        self.show_homescreen()
+        # pass a Message so show_homescreen doesn't have to dig for one
+        self.show_homescreen(Message("homescreen.manager.show_active"))
+
+    def start(self):
+        """
+        Start the Manager, this only emits bus messages and returns
+        immediately, so it runs in the calling thread.
+        """
+        self.run()
+
+    def shutdown(self):
+        """
+        Remove bus handlers and cancel a pending homescreen display check
+        """
+        for msg_type, handler in self._bus_handlers.items():
+            self.bus.remove(msg_type, handler)
+        with self._add_lock:
+            if self._add_timer is not None:
+                self._add_timer.cancel()
+                self._add_timer = None
+            self._pending_adds = set()
+        with self._activation_lock:
+            if self._activation_timer is not None:
+                self._activation_timer.cancel()
+                self._activation_timer = None
+            self._pending_activation = None
+
+    def _get_idle_display_skill(self) -> Optional[str]:
+        """
+        Get the configured `idle_display_skill`, config is only read again
+        after it changes
+        @return: configured homescreen ID, if any
+        """
+        idle_display_skill = self._idle_display_skill
+        if idle_display_skill is _NOT_LOADED:
+            gui_config = Configuration().get("gui") or {}
+            idle_display_skill = gui_config.get("idle_display_skill")
+            self._idle_display_skill = idle_display_skill
+        return idle_display_skill
+
+    def handle_config_updated(self, message: Optional[Message] = None):
+        """
+        Handle `configuration.updated`, `configuration.patch.clear` and
+        config file changes, read the configured homescreen again when it is
+        next needed
+        @param message: configuration change Message, None for file changes
+        """
+        self._idle_display_skill = _NOT_LOADED
+
+    def handle_config_patch(self, message: Message):
+        """
+        Handle `configuration.patch` and track changes to the configured
+        homescreen, including the ones made by this class
+        @param message: Message containing the patched configuration
+        """
+        gui_config = (message.data.get("config") or {}).get("gui") or {}
+        if "idle_display_skill" in gui_config:
+            self._idle_display_skill = gui_config["idle_display_skill"]
 
     def add_homescreen(self, message: Message):
         """
@@ -37,14 +133,36 @@ class HomescreenManager(Thread):
         """
         homescreen_id = message.data["id"]
 
-        if any((homescreen['id'] == homescreen_id
-                for homescreen in self.homescreens)):
-            LOG.info(f"Requested homescreen_id already exists: {homescreen_id}")
+        if homescreen_id in self.homescreens:
+            LOG.info("Requested homescreen_id already exists: %s",
+                     homescreen_id)
         else:
-            LOG.info(f"Homescreen Manager: Adding Homescreen {homescreen_id}")
-            self.homescreens.append(message.data)
+            LOG.info("Homescreen Manager: Adding Homescreen %s", homescreen_id)
+            self.homescreens[homescreen_id] = message.data
 
-        self.show_homescreen_on_add(homescreen_id)
+        if not self._get_idle_display_skill():
+            # no homescreen configured, nothing to display
+            return
+        with self._add_lock:
+            self._pending_adds.add(homescreen_id)
+            if self._add_timer is None:
+                self._add_timer = Timer(self.add_debounce,
+                                        self._flush_pending_adds)
+                self._add_timer.daemon = True
+                self._add_timer.start()
+
+    def _flush_pending_adds(self):
+        """
+        Display the active homescreen if it was added since the last check,
+        a burst of registrations results in a single check
+        """
+        with self._add_lock:
+            pending = self._pending_adds
+            self._pending_adds = set()
+            self._add_timer = None
+        active_homescreen = self._get_idle_display_skill()
+        if active_homescreen in pending:
+            self.show_homescreen_on_add(active_homescreen)
 
     def remove_homescreen(self, message: Message):
         """
@@ -53,10 +171,8 @@ class HomescreenManager(Thread):
         @param message: Message containing homescreen id to remove
         """
         homescreen_id = message.data["id"]
-        LOG.info(f"Homescreen Manager: Removing Homescreen {homescreen_id}")
-        for h in self.homescreens:
-            if homescreen_id == h["id"]:
-                self.homescreens.remove(h)
+        LOG.info("Homescreen Manager: Removing Homescreen %s", homescreen_id)
+        self.homescreens.pop(homescreen_id, None)
 
     def get_homescreens(self, message: Message):
         """
@@ -64,7 +180,8 @@ class HomescreenManager(Thread):
         homescreens.
         :param message: Message requesting homescreens
         """
-        self.bus.emit(message.response({"homescreens": self.homescreens}))
+        self.bus.emit(message.response(
+            {"homescreens": list(self.homescreens.values())}))
 
     def handle_get_active_homescreen(self, message: Message):
         """
@@ -82,7 +199,7 @@ class HomescreenManager(Thread):
         @param message: Message containing requested homescreen ID
         """
         new_homescreen = message.data.get("id")
-        LOG.debug(f"Requested updating homescreen to: {new_homescreen}")
+        LOG.debug("Requested updating homescreen to: %s", new_homescreen)
         self.set_active_homescreen(new_homescreen)
 
     def get_active_homescreen(self) -> Optional[dict]:
@@ -90,16 +207,16 @@ class HomescreenManager(Thread):
         Get the active homescreen according to configuration if it is loaded
         @return: Loaded homescreen with an ID matching configuration
         """
-        gui_config = Configuration().get("gui") or {}
-        active_homescreen = gui_config.get("idle_display_skill")
+        active_homescreen = self._get_idle_display_skill()
         if not active_homescreen:
             LOG.info("No homescreen enabled in mycroft.conf")
             return
-        LOG.info(f"Active Homescreen: {active_homescreen}")
-        for h in self.homescreens:
-            if h["id"] == active_homescreen:
-                return active_homescreen
-        LOG.error(f"{active_homescreen} not loaded!")
+        if active_homescreen != self._logged_active_homescreen:
+            self._logged_active_homescreen = active_homescreen
+            LOG.info("Active Homescreen: %s", active_homescreen)
+        if active_homescreen in self.homescreens:
+            return active_homescreen
+        LOG.error("%s not loaded!", active_homescreen)
 
     def set_active_homescreen(self, homescreen_id: str):
         """
@@ -107,12 +224,12 @@ class HomescreenManager(Thread):
         @param homescreen_id: new `idle_display_skill`
         """
         # TODO: Validate requested homescreen_id
-        if Configuration().get("gui",
-                               {}).get("idle_display_skill") != homescreen_id:
-            LOG.info(f"Updating configured idle_display_skill to "
-                     f"{homescreen_id}")
+        if self._get_idle_display_skill() != homescreen_id:
+            LOG.info("Updating configured idle_display_skill to %s",
+                     homescreen_id)
             new_config = {"gui": {"idle_display_skill": homescreen_id}}
             update_mycroft_config(new_config, bus=self.bus)
+            self._idle_display_skill = homescreen_id
 
     def reload_homescreens_list(self):
         """
@@ -126,14 +243,14 @@ class HomescreenManager(Thread):
         Check if a homescreen should be displayed immediately upon addition
         @param homescreen_id: ID of added homescreen
         """
-        LOG.debug(f"Checking {homescreen_id}")
-        if self.get_active_homescreen() != homescreen_id:
+        # the added homescreen is loaded, only the configured id matters
+        if self._get_idle_display_skill() != homescreen_id:
             # Added homescreen isn't the configured one, do nothing
             return
 
-        LOG.info(f"Displaying Homescreen {homescreen_id}")
-        self.bus.emit(Message("homescreen.manager.activate.display",
-                              {"homescreen_id": homescreen_id}))
+        LOG.info("Displaying Homescreen %s", homescreen_id)
+        self._schedule_activation(Message("homescreen.manager.activate.display",
+                                          {"homescreen_id": homescreen_id}))
 
     def disable_active_homescreen(self, message: Message):
         """
@@ -141,30 +258,59 @@ class HomescreenManager(Thread):
         `idle_display_skill` as None.
         @param message: Message requesting homescreen disable
         """
-        if Configuration().get("gui", {}).get("idle_display_skill"):
-            LOG.info(f"Disabling idle_display_skill!")
+        if self._get_idle_display_skill():
+            LOG.info("Disabling idle_display_skill!")
             new_config = {"gui": {"idle_display_skill": None}}
             update_mycroft_config(new_config, bus=self.bus)
+            self._idle_display_skill = None
 
     def show_homescreen(self, message: Optional[Message] = None):
         """
         Handle a request to show the homescreen.
         @param message: Optional `homescreen.manager.show_active` Message
         """
-        active_homescreen = self.get_active_homescreen()
+        active_homescreen = self._get_idle_display_skill()
         if not active_homescreen:
             LOG.info("No active homescreen to display")
             return
-        LOG.info(f"Requesting activation of {active_homescreen}")
-        for h in self.homescreens:
-            if h.get("id") == active_homescreen:
-                LOG.debug(f"matched homescreen skill: {h}")
-                message = message or dig_for_message() or Message("")
-                LOG.debug(f"Displaying Homescreen {active_homescreen}")
-                self.bus.emit(message.forward(
-                    "homescreen.manager.activate.display",
-                    {"homescreen_id": active_homescreen}))
-                break
+        h = self.homescreens.get(active_homescreen)
+        if h is None:
+            LOG.warning("Requested %s not found in: %s", active_homescreen,
+                        list(self.homescreens))
+            return
+        if is_debug_enabled():
+            LOG.debug("Requesting activation of %s: %s", active_homescreen, h)
+        data = {"homescreen_id": active_homescreen}
+        message = message or dig_for_message()
+        if message is None:
+            # no context to forward
+            activation = Message("homescreen.manager.activate.display", data)
         else:
-            LOG.warning(f"Requested {active_homescreen} not found in: "
-                        f"{self.homescreens}")
+            activation = message.forward(
+                "homescreen.manager.activate.display", data)
+        self._schedule_activation(activation)
+
+    def _schedule_activation(self, message: Message):
+        """
+        Queue a `homescreen.manager.activate.display` Message, only the latest
+        request within `activate_debounce` seconds is emitted
+        @param message: activation Message to emit
+        """
+        with self._activation_lock:
+            self._pending_activation = message
+            if self._activation_timer is None:
+                self._activation_timer = Timer(self.activate_debounce,
+                                               self._emit_pending_activation)
+                self._activation_timer.daemon = True
+                self._activation_timer.start()
+
+    def _emit_pending_activation(self):
+        """
+        Emit the latest queued homescreen activation, if any
+        """
+        with self._activation_lock:
+            message = self._pending_activation
+            self._pending_activation = None
+            self._activation_timer = None
+        if message is not None:
+            self.bus.emit(message)
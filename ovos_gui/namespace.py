@@ -39,10 +39,15 @@ The state of the active namespace stack is maintained locally and in the GUI
 code.  Changes to namespaces, and their contents, are communicated to the GUI
 over the GUI message bus.
 """
+import heapq
+import os
 import shutil
-from os.path import join, dirname, exists
-from threading import Lock, Timer
-from typing import List, Union, Optional, Dict
+from itertools import count
+from os.path import join, dirname, exists, relpath
+from queue import Queue
+from threading import Condition, Lock, RLock, Thread
+from time import monotonic
+from typing import Callable, List, Union, Optional, Dict, Tuple
 
 from ovos_bus_client import Message, MessageBusClient
 from ovos_config.config import Configuration
@@ -52,14 +57,16 @@ from ovos_gui.bus import (
     create_gui_service,
     determine_if_gui_connected,
     get_gui_websocket_config,
-    send_message_to_gui, GUIWebsocketHandler
+    send_message_to_gui, get_gui_clients,
+    build_pages_payload, serialize_pages, serialize_message, gui_batch,
+    get_qt_framework
 )
 from ovos_gui.constants import GUI_CACHE_PATH
 from ovos_gui.page import GuiPage
 
 namespace_lock = Lock()
 
-RESERVED_KEYS = ['__from', '__idle']
+RESERVED_KEYS = frozenset(('__from', '__idle'))
 
 
 def _validate_page_message(message: Message) -> bool:
@@ -70,11 +77,8 @@ def _validate_page_message(message: Message) -> bool:
         from a namespace.
     @returns: True if request is valid, else False
     """
-    valid = (
-            "page_names" in message.data
-            and "__from" in message.data
-            and isinstance(message.data["page_names"], list)
-    )
+    data = message.data
+    valid = "__from" in data and isinstance(data.get("page_names"), list)
     if not valid:
         if message.msg_type == "gui.page.show":
             action = "shown"
@@ -85,30 +89,156 @@ def _validate_page_message(message: Message) -> bool:
     return valid
 
 
-def _get_idle_display_config() -> str:
+def _get_resource_manifest(path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Get the size and modification time of every file in a resource directory
+    @param path: directory to scan
+    @return: dict of relative file paths to (size, mtime in ns)
+    """
+    manifest = dict()
+    for root, _, files in os.walk(path):
+        for file in files:
+            stat = os.stat(join(root, file))
+            manifest[relpath(join(root, file), path)] = \
+                (stat.st_size, stat.st_mtime_ns)
+    return manifest
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """
+    Hardlink a file, copying it if linking is not possible, for example when
+    `dst` is on a different filesystem. Used as `copytree` copy function.
+    @param src: file to link
+    @param dst: path of the new file
+    @return: path of the new file
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _get_idle_display_config(gui_config: Optional[dict] = None) -> str:
     """
     Retrieves the current value of the idle display skill configuration.
+    @param gui_config: `gui` config section, read from config if not provided
     @returns: Configured idle_display_skill (skill_id)
     """
-    config = Configuration()
-    enclosure_config = config.get("gui") or {}
+    if gui_config is None:
+        gui_config = Configuration().get("gui")
+    enclosure_config = gui_config or {}
     idle_display_skill = enclosure_config.get("idle_display_skill")
     LOG.info(f"Configured homescreen: {idle_display_skill}")
     return idle_display_skill
 
 
-def _get_active_gui_extension() -> str:
+def _get_active_gui_extension(gui_config: Optional[dict] = None) -> str:
     """
     Retrieves the current value of the gui extension configuration.
+    @param gui_config: `gui` config section, read from config if not provided
     @returns: Configured gui extension
     """
-    config = Configuration()
-    enclosure_config = config.get("gui") or {}
+    if gui_config is None:
+        gui_config = Configuration().get("gui")
+    enclosure_config = gui_config or {}
     gui_extension = enclosure_config.get("extension", "generic")
     LOG.info(f"Configured GUI extension: {gui_extension}")
     return gui_extension.lower()
 
 
+class _ScheduledCall:
+    """
+    A call scheduled with `_Scheduler`, cancel it like a `threading.Timer`
+    """
+
+    def __init__(self, func: Callable, args: tuple):
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Stop the call from running, if it has not started yet
+        """
+        self.cancelled = True
+
+
+class _Scheduler:
+    """
+    Runs delayed calls from a single daemon thread, in order of their
+    deadlines. Replaces a `threading.Timer`, and so a thread, per call.
+    """
+
+    def __init__(self):
+        # (deadline, sequence number, call), the sequence number keeps calls
+        # with the same deadline in the order they were scheduled
+        self._heap: List[Tuple[float, int, _ScheduledCall]] = list()
+        self._sequence = count()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+
+    def schedule(self, delay: float, func: Callable, *args) -> _ScheduledCall:
+        """
+        Call `func(*args)` after `delay` seconds
+        @param delay: seconds to wait before calling `func`
+        @param func: function to call
+        @return: scheduled call, which may be cancelled
+        """
+        call = _ScheduledCall(func, args)
+        with self._condition:
+            heapq.heappush(self._heap,
+                           (monotonic() + delay, next(self._sequence), call))
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+            # the new call may be due before the one being waited for
+            self._condition.notify()
+        return call
+
+    def _next_call(self) -> _ScheduledCall:
+        """
+        Wait for the next call that is due and was not cancelled
+        """
+        heap = self._heap
+        with self._condition:
+            while True:
+                while heap and heap[0][2].cancelled:
+                    heapq.heappop(heap)
+                if not heap:
+                    self._condition.wait()
+                    continue
+                delay = heap[0][0] - monotonic()
+                if delay <= 0:
+                    return heapq.heappop(heap)[2]
+                self._condition.wait(delay)
+
+    def _run(self):
+        while True:
+            call = self._next_call()
+            if call.cancelled:
+                continue
+            try:
+                call.func(*call.args)
+            except Exception as e:
+                LOG.exception(f"Scheduled call failed: {e}")
+
+
+class _PageState:
+    """
+    Pages of a namespace and the values derived from them. Replaced as a
+    whole when pages change, so a reader never combines new pages with
+    values derived from the old ones.
+    """
+
+    def __init__(self, pages: List[GuiPage]):
+        self.pages = pages
+        # resolved page URIs per GUI framework, in the order of `pages`
+        self.urls: Dict[str, List[str]] = dict()
+        # position of each page by name, see Namespace.get_page_index
+        self.index: Optional[Dict[str, int]] = None
+
+
 class Namespace:
     """A grouping mechanism for related GUI pages and data.
 
@@ -132,11 +262,120 @@ class Namespace:
         self.skill_id = skill_id
         self.persistent = False
         self.duration = 30
+        # (page state, serialized sync messages) per GUI framework, see
+        # get_sync_frames
+        self._sync_cache: Dict[str, Tuple[_PageState, List[bytes]]] = dict()
+        # pages are replaced, not modified in place, see _PageState
         self.pages: List[GuiPage] = list()
         self.data = dict()
         self.page_number = 0
         self.session_set = False
 
+    @property
+    def pages(self) -> List[GuiPage]:
+        return self._page_state.pages
+
+    @pages.setter
+    def pages(self, pages: List[GuiPage]):
+        self._page_state = _PageState(pages)
+        self.invalidate_sync_cache()
+
+    @property
+    def data(self) -> dict:
+        return self._data
+
+    @data.setter
+    def data(self, data: dict):
+        self._data = data
+        self.invalidate_sync_cache()
+
+    def invalidate_sync_cache(self):
+        """
+        Drop cached sync messages, must be called after data is modified in
+        place.
+        """
+        # replace instead of clearing, so a sync running concurrently in
+        # the GUI bus thread can not store stale messages
+        self._sync_cache = dict()
+
+    def invalidate_page_cache(self):
+        """
+        Drop resolved page URIs and cached sync messages, must be called
+        after pages are modified in place.
+        """
+        self.pages = self.pages
+
+    def get_page_index(self, name: str) -> Optional[int]:
+        """
+        Get the position of a page in `pages`
+        @param name: name of the page to look up
+        @return: index of the first page with this name, None if not loaded
+        """
+        state = self._page_state
+        index = state.index
+        if index is None:
+            index = dict()
+            for position, page in enumerate(state.pages):
+                index.setdefault(page.name, position)
+            state.index = index
+        return index.get(name)
+
+    def get_page_urls(self, framework: str) -> List[Optional[str]]:
+        """
+        Get the URIs of this namespace's pages for a GUI framework
+        @param framework: GUI framework to resolve page URIs for
+        @return: list of page URIs, in the same order as `pages`
+        """
+        return self._get_page_urls(self._page_state, framework)
+
+    @staticmethod
+    def _get_page_urls(state: _PageState,
+                       framework: str) -> List[Optional[str]]:
+        """
+        Get the URIs of the pages in a page state for a GUI framework
+        @param state: page state to resolve URIs for
+        @param framework: GUI framework to resolve page URIs for
+        @return: list of page URIs, in the same order as `state.pages`
+        """
+        urls = state.urls.get(framework)
+        if urls is None:
+            urls = [page.get_uri(framework) for page in state.pages]
+            # resources may still be uploaded, only cache resolved pages
+            if None not in urls:
+                state.urls[framework] = urls
+        return urls
+
+    def get_sync_frames(self, framework: str) -> List[bytes]:
+        """
+        Get the serialized messages that upload this namespace's pages and
+        data to a newly connected GUI client. All data is sent in a single
+        `mycroft.session.set` message.
+        @param framework: GUI framework of the client being synchronized
+        @return: list of serialized messages to send
+        """
+        state = self._page_state
+        cache = self._sync_cache
+        cached = cache.get(framework)
+        if cached is not None and cached[0] is state:
+            frames = cached[1]
+        else:
+            skill_id = self.skill_id
+            urls = self._get_page_urls(state, framework)
+            pages_data = serialize_message(
+                [{"url": url, "page": page.name}
+                 for url, page in zip(urls, state.pages)])
+            frames = [build_pages_payload(pages_data, skill_id, 0)]
+            data = dict(self.data)
+            if data:
+                # the protocol allows setting several keys in one message
+                frames.append(serialize_message({
+                    "type": "mycroft.session.set",
+                    "namespace": skill_id,
+                    "data": data}))
+            if None not in urls:
+                cache[framework] = (state, frames)
+        return frames
+
     @property
     def page_names(self):
         return [page.name for page in self.pages]
@@ -188,18 +427,19 @@ class Namespace:
         @param position: position to remove this namespace FROM
         """
         LOG.info(f"GUI PROTOCOL - Removing \"{self.skill_id}\" from active namespaces")
-        # unload the data first before removing the namespace
-        # use the keys of the data to unload the data
-        for key in self.data:
-            self.unload_data(key)
+        with gui_batch():
+            # unload the data first before removing the namespace
+            # use the keys of the data to unload the data
+            for key in self.data:
+                self.unload_data(key)
 
-        message = dict(
-            type="mycroft.session.list.remove",
-            namespace="mycroft.system.active_skills",
-            position=position,
-            items_number=1
-        )
-        send_message_to_gui(message)
+            message = dict(
+                type="mycroft.session.list.remove",
+                namespace="mycroft.system.active_skills",
+                position=position,
+                items_number=1
+            )
+            send_message_to_gui(message)
         self.session_set = False
         self.pages = list()
         self.data = dict()
@@ -220,6 +460,20 @@ class Namespace:
         )
         send_message_to_gui(message)
 
+    def load_data_items(self, data: dict):
+        """
+        Adds or changes the values of several namespace data attributes in a
+        single message.
+        @param data: names and values of the attributes
+        """
+        LOG.info(f"GUI PROTOCOL - Sending \"{self.skill_id}\" data -- {data}")
+        message = dict(
+            type="mycroft.session.set",
+            namespace=self.skill_id,
+            data=data
+        )
+        send_message_to_gui(message)
+
     def unload_data(self, name: str):
         """
         Delete data from the namespace
@@ -294,19 +548,23 @@ class Namespace:
         new_pages = list()
         target_page = pages[show_index]
 
+        new_names = set()
         for page in pages:
-            if page.name not in [p.name for p in self.pages]:
+            if page.name not in new_names and \
+                    self.get_page_index(page.name) is None:
+                new_names.add(page.name)
                 new_pages.append(page)
 
-        self.pages.extend(new_pages)
-        if new_pages:
-            self._add_pages(new_pages)
-        if show_index >= len(pages):
-            LOG.error(
-                f"Invalid page index requested: {show_index} , only {len(pages)} pages available for \"{self.skill_id}\"")
-        else:
-            LOG.info(f"Activating page {show_index} from: {[p.name for p in pages]} for \"{self.skill_id}\"")
-            self._activate_page(target_page)
+        with gui_batch():
+            if new_pages:
+                self.pages = self.pages + new_pages
+                self._add_pages(new_pages)
+            if show_index >= len(pages):
+                LOG.error(
+                    f"Invalid page index requested: {show_index} , only {len(pages)} pages available for \"{self.skill_id}\"")
+            else:
+                LOG.info(f"Activating page {show_index} from: {[p.name for p in pages]} for \"{self.skill_id}\"")
+                self._activate_page(target_page)
 
     def _add_pages(self, new_pages: List[GuiPage]):
         """
@@ -318,12 +576,21 @@ class Namespace:
 
         # Find position of new page in self.pages
         position = self.pages.index(new_pages[0])
-        for client in GUIWebsocketHandler.clients:
+        # clients using the same framework receive the same payload
+        payloads: Dict[str, bytes] = dict()
+        for client in get_gui_clients():
+            framework = client.framework
             try:
-                LOG.debug(f"Updating {client.framework} client")
-                client.send_gui_pages(new_pages, self.skill_id, position)
+                LOG.debug(f"Updating {framework} client")
+                payload = payloads.get(framework)
+                if payload is None:
+                    payload = build_pages_payload(
+                        serialize_pages(new_pages, framework),
+                        self.skill_id, position)
+                    payloads[framework] = payload
+                client.send_raw(payload)
             except Exception as e:
-                LOG.exception(f"Error updating {client.framework} client: {e}")
+                LOG.exception(f"Error updating {framework} client: {e}")
 
     def focus_page(self, page):
         """
@@ -332,21 +599,18 @@ class Namespace:
         @param page: the page that will gain focus
         """
         # set the index of the page in the self.pages list
-        page_index = None
-        for i, p in enumerate(self.pages):
-            if p.name == page.name:
-                # save page index
-                page_index = i
-                break
+        page_index = self.get_page_index(page.name)
 
         # handle missing page (TODO, can this happen?)
         if page_index is None:
             LOG.warning("tried to activate page missing from pages list, inserting it at index 0")
             page_index = 0
-            self.pages.insert(0, page)
-        # update page data
-        else:
-            self.pages[page_index] = page
+            self.pages = [page] + self.pages
+        # update page data, page URIs only change with the page itself
+        elif self.pages[page_index] != page:
+            pages = list(self.pages)
+            pages[page_index] = page
+            self.pages = pages
 
         if page_index != self.page_number:
             self.page_number = page_index
@@ -378,14 +642,26 @@ class Namespace:
         @param positions: list of int page positions to remove
         """
         positions.sort(reverse=True)
+        # group consecutive positions, each group is removed in one message
+        runs: List[List[int]] = list()
         for position in positions:
-            page = self.pages.pop(position)
-            LOG.info(f"GUI PROTOCOL - Deleting {page.name} -- namespace: \"{self.skill_id}\"")
+            if runs and runs[-1][-1] - 1 == position:
+                runs[-1].append(position)
+            else:
+                runs.append([position])
+
+        for run in runs:
+            position = run[-1]
+            items_number = len(run)
+            pages = self.pages
+            removed = pages[position:position + items_number]
+            self.pages = pages[:position] + pages[position + items_number:]
+            LOG.info(f"GUI PROTOCOL - Deleting {[p.name for p in removed]} -- namespace: \"{self.skill_id}\"")
             message = dict(
                 type="mycroft.gui.list.remove",
                 namespace=self.skill_id,
                 position=position,
-                items_number=1
+                items_number=items_number
             )
             send_message_to_gui(message)
 
@@ -419,26 +695,49 @@ class NamespaceManager:
         remove_namespace_timers: background process to remove a namespace with
             a persistence expressed in seconds
         idle_display_skill: skill ID of the skill that controls the idle screen
-    """
 
+    `active_namespaces` and `remove_namespace_timers` are only changed while
+    holding `_state_lock`, the innermost lock after `namespace_lock` and the
+    per namespace locks. Reads don't lock: membership checks are allowed to
+    be stale, and readers needing more than one access take a snapshot with
+    `list(self.active_namespaces)`.
+    """
     def __init__(self, core_bus: MessageBusClient):
         self.core_bus = core_bus
         self.gui_bus = create_gui_service(self)
         self.loaded_namespaces: Dict[str, Namespace] = dict()
         self.active_namespaces: List[Namespace] = list()
-        self.remove_namespace_timers: Dict[str, Timer] = dict()
-        self.idle_display_skill = _get_idle_display_config()
-        self.active_extension = _get_active_gui_extension()
+        self.remove_namespace_timers: Dict[str, _ScheduledCall] = dict()
+        # guards changes to active_namespaces and remove_namespace_timers
+        self._state_lock = Lock()
+        # per namespace locks, see _get_namespace_lock
+        self._namespace_locks: Dict[str, RLock] = dict()
+        self._namespace_locks_lock = Lock()
+        # core bus notifications, emitted from a background thread
+        self._emit_queue: Queue = Queue()
+        self._emitter: Optional[Thread] = None
+        self._emitter_lock = Lock()
+        # one thread runs all scheduled namespace removals
+        self._removal_scheduler = _Scheduler()
+        self._load_gui_config()
         self._system_res_dir = join(dirname(__file__), "res", "gui")
         self._init_gui_file_share()
         self._define_message_handlers()
 
+    def _load_gui_config(self):
+        """
+        Read the configured homescreen and GUI extension from a single
+        snapshot of the `gui` config section.
+        """
+        gui_config = Configuration().get("gui") or {}
+        self.idle_display_skill = _get_idle_display_config(gui_config)
+        self.active_extension = _get_active_gui_extension(gui_config)
+
     def _init_gui_file_share(self):
         """
         Initialize optional GUI file collection. if `gui_file_path` is
         defined, resources are assumed to be referenced outside this container.
         """
-        config = Configuration().get("gui", {})
         self._cache_system_resources()
 
     def _define_message_handlers(self):
@@ -456,6 +755,12 @@ class NamespaceManager:
         self.core_bus.on("gui.page_interaction", self.handle_page_interaction)
         self.core_bus.on("gui.page_gained_focus", self.handle_page_gained_focus)
         self.core_bus.on("mycroft.gui.screen.close", self.handle_namespace_global_back)
+        self.core_bus.on("configuration.updated", self.handle_config_updated)
+        self.core_bus.on("configuration.patch", self.handle_config_patch)
+        self.core_bus.on("configuration.patch.clear",
+                         self.handle_config_updated)
+        # config files edited on disk are reloaded without a bus message
+        Configuration.set_config_watcher(self.handle_config_updated)
         self._define_messages_to_forward()
 
     def _define_messages_to_forward(self):
@@ -504,6 +809,28 @@ class NamespaceManager:
         for msg in messages_to_forward:
             self.core_bus.on(msg, self.forward_to_gui)
 
+    def handle_config_updated(self, message: Optional[Message] = None):
+        """
+        Handle `configuration.updated`, `configuration.patch.clear` and
+        config file changes, read the configured homescreen and GUI extension
+        again, they are not read from config per message.
+        @param message: configuration change Message, None for file changes
+        """
+        self._load_gui_config()
+
+    def handle_config_patch(self, message: Message):
+        """
+        Handle `configuration.patch` and apply changes to the configured
+        homescreen and GUI extension.
+        @param message: Message containing the patched configuration
+        """
+        gui_config = (message.data.get("config") or {}).get("gui") or {}
+        if "idle_display_skill" in gui_config:
+            self.idle_display_skill = gui_config["idle_display_skill"]
+        if "extension" in gui_config:
+            self.active_extension = \
+                (gui_config["extension"] or "generic").lower()
+
     @staticmethod
     def forward_to_gui(message: Message):
         """
@@ -532,7 +859,7 @@ class NamespaceManager:
             )
         else:
             if self.loaded_namespaces.get(namespace_name):
-                with namespace_lock:
+                with namespace_lock, gui_batch():
                     self._remove_namespace(namespace_name)
 
     @staticmethod
@@ -638,7 +965,6 @@ class NamespaceManager:
 
         namespace_name = message.data["__from"]
         page_ids_to_show = message.data.get('page_names')
-        persistence = message.data["__idle"]
         show_index = message.data.get("index", 0)
 
         LOG.debug(f"Got {namespace_name} request to show: {page_ids_to_show} at index: {show_index}")
@@ -654,15 +980,16 @@ class NamespaceManager:
             LOG.error(f"Can't show page, bad message: {message.data}")
             return
 
-        with namespace_lock:
-            if not self.active_namespaces:
+        # data updates to this namespace wait until the batch is sent, so
+        # they can't reach the GUI ahead of the namespace and its old data
+        with namespace_lock, self._get_namespace_lock(namespace_name), \
+                gui_batch():
+            active_namespaces = list(self.active_namespaces)
+            if not active_namespaces or \
+                    active_namespaces[0].skill_id != namespace_name:
                 self._activate_namespace(namespace_name)
-            else:
-                active_namespace = self.active_namespaces[0]
-                if active_namespace.skill_id != namespace_name:
-                    self._activate_namespace(namespace_name)
             self._load_pages(pages, show_index)
-            self._update_namespace_persistence(persistence)
+            self._update_namespace_persistence(persist)
 
     def _activate_namespace(self, namespace_name: str):
         """
@@ -672,24 +999,54 @@ class NamespaceManager:
         """
         namespace = self._ensure_namespace_exists(namespace_name)
 
-        if namespace in self.active_namespaces:
-            namespace_position = self.active_namespaces.index(namespace)
-            namespace.activate(namespace_position)
-            if namespace_position != 0:
-                LOG.info(f"Activating namespace: {namespace_name}")
-                self.active_namespaces.insert(
-                    0, self.active_namespaces.pop(namespace_position)
-                )
-        else:
-            LOG.info(f"New namespace: {namespace_name}")
-            namespace.add()
-            self.active_namespaces.insert(0, namespace)
-            # sync initial state
-            for key, value in namespace.data.items():
-                namespace.load_data(key, value)
+        with self._get_namespace_lock(namespace_name), self._state_lock:
+            namespace_position = self._get_active_position(namespace)
+            if namespace_position is not None:
+                namespace.activate(namespace_position)
+                if namespace_position != 0:
+                    LOG.info(f"Activating namespace: {namespace_name}")
+                    self.active_namespaces.insert(
+                        0, self.active_namespaces.pop(namespace_position)
+                    )
+            else:
+                LOG.info(f"New namespace: {namespace_name}")
+                namespace.add()
+                self.active_namespaces.insert(0, namespace)
+                # sync initial state
+                for key, value in namespace.data.items():
+                    namespace.load_data(key, value)
 
         self._emit_namespace_displayed_event()
 
+    def _get_active_position(self, namespace: Optional[Namespace]) -> \
+            Optional[int]:
+        """
+        Get the position of a namespace in the active namespace stack, in a
+        single scan of the stack.
+        @param namespace: namespace to look up
+        @returns: position of the namespace, None if it is not active
+        """
+        for position, active_namespace in enumerate(self.active_namespaces):
+            if active_namespace is namespace:
+                return position
+        return None
+
+    def _get_namespace_lock(self, namespace_name: str) -> RLock:
+        """
+        Get the lock guarding the data of a namespace. Namespace data is
+        updated holding only this lock, structural changes of the active
+        namespace stack hold `namespace_lock`, then this lock and then
+        `_state_lock`. Showing pages holds this lock until its messages
+        are sent to the GUI, and takes it again to activate the namespace.
+        @param namespace_name: the name of the namespace
+        @returns: lock for the requested namespace
+        """
+        lock = self._namespace_locks.get(namespace_name)
+        if lock is None:
+            with self._namespace_locks_lock:
+                lock = self._namespace_locks.setdefault(namespace_name, RLock())
+        return lock
+
     def _ensure_namespace_exists(self, namespace_name: str) -> Namespace:
         """
         Retrieves the requested namespace, creating one if it doesn't exist.
@@ -699,8 +1056,10 @@ class NamespaceManager:
         # TODO: - Update sync to match.
         namespace = self.loaded_namespaces.get(namespace_name)
         if namespace is None:
-            namespace = Namespace(namespace_name)
-            self.loaded_namespaces[namespace_name] = namespace
+            # data updates create namespaces without holding namespace_lock,
+            # keep the namespace another thread may have just added
+            namespace = self.loaded_namespaces.setdefault(
+                namespace_name, Namespace(namespace_name))
 
         return namespace
 
@@ -710,7 +1069,8 @@ class NamespaceManager:
         @param pages_to_show: list of pages to be loaded
         @param show_index: index to load pages at
         """
-        if not self.active_namespaces:
+        active_namespaces = list(self.active_namespaces)
+        if not active_namespaces:
             LOG.error("received 'load_pages' request but there are no active namespaces")
             return
 
@@ -718,7 +1078,7 @@ class NamespaceManager:
             LOG.error(f"requested invalid page index: {show_index}, defaulting to last page")
             show_index = len(pages_to_show) - 1
 
-        active_namespace = self.active_namespaces[0]
+        active_namespace = active_namespaces[0]
         oldp = [p.name for p in active_namespace.pages]
         active_namespace.load_pages(pages_to_show, show_index)
         # LOG only on change
@@ -727,7 +1087,7 @@ class NamespaceManager:
             LOG.info(f"Loaded {active_namespace.skill_id} at index: {pn} "
                      f"pages: {[p.name for p in active_namespace.pages]}")
 
-    def _update_namespace_persistence(self, persistence: Union[bool, int]):
+    def _update_namespace_persistence(self, persistence: bool):
         """
         Sets the persistence of the namespace being activated.
         A namespace's persistence is the same as the persistence of the
@@ -736,9 +1096,12 @@ class NamespaceManager:
         True (show until removed) and the last page with a persistence of
         15 seconds.  This would ensure that the namespace isn't removed while
         the skill is showing the pages.
-        @param persistence: length of time the namespace should be displayed
+        @param persistence: True if the namespace should be displayed until
+            removed, as parsed by `_parse_persistence`. A duration is set by
+            the namespace's active page.
         """
-        for idx, namespace in enumerate(self.active_namespaces):
+        # namespaces are removed while iterating, walk a snapshot
+        for idx, namespace in enumerate(list(self.active_namespaces)):
             if idx:
                 if not namespace.persistent:
                     self._remove_namespace(namespace.skill_id)
@@ -753,42 +1116,43 @@ class NamespaceManager:
                     namespace.set_persistence(skill_type="genericSkill")
                     # check if there is a scheduled remove_namespace_timer
                     # and cancel it
-                    if namespace.persistent and namespace.skill_id in \
-                            self.remove_namespace_timers:
-                        self.remove_namespace_timers[namespace.skill_id].cancel()
-                        self._del_namespace_in_remove_timers(namespace.skill_id)
+                    if namespace.persistent:
+                        with self._state_lock:
+                            timer = self.remove_namespace_timers.pop(
+                                namespace.skill_id, None)
+                        if timer is not None:
+                            timer.cancel()
 
                 if not namespace.persistent:
                     self._schedule_namespace_removal(namespace)
 
-                self.active_namespaces[idx] = namespace
-
     def _schedule_namespace_removal(self, namespace: Namespace):
         """
-        Uses a timer thread to remove the namespace.
+        Schedules removal of the namespace after its duration.
         @param namespace: the namespace to be removed
         """
-        # Before removing check if there isn't already a timer for this namespace
-        if namespace.skill_id in self.remove_namespace_timers:
-            return
+        with self._state_lock:
+            # Before removing check if there isn't already a timer for this namespace
+            if namespace.skill_id in self.remove_namespace_timers:
+                return
 
-        remove_namespace_timer = Timer(
-            namespace.duration,
-            self._remove_namespace_via_timer,
-            args=(namespace.skill_id,)
-        )
+            remove_namespace_timer = self._removal_scheduler.schedule(
+                namespace.duration,
+                self._remove_namespace_via_timer,
+                namespace.skill_id
+            )
+            self.remove_namespace_timers[namespace.skill_id] = \
+                remove_namespace_timer
         LOG.info(f"Removal of namespace {namespace.skill_id} in "
                  f"{namespace.duration} seconds")
-        remove_namespace_timer.start()
-        self.remove_namespace_timers[namespace.skill_id] = remove_namespace_timer
 
     def _remove_namespace_via_timer(self, namespace_name: str):
         """
         Removes a namespace and the corresponding timer instance.
         @param namespace_name: name of namespace to remove
         """
+        # _remove_namespace drops the timer entry
         self._remove_namespace(namespace_name)
-        self._del_namespace_in_remove_timers(namespace_name)
 
     def _remove_namespace(self, namespace_name: str):
         """
@@ -796,18 +1160,20 @@ class NamespaceManager:
         @param namespace_name: name of namespace to remove
         """
         # Remove all timers associated with the namespace
-        if namespace_name in self.remove_namespace_timers:
-            self.remove_namespace_timers[namespace_name].cancel()
-            self._del_namespace_in_remove_timers(namespace_name)
+        with self._state_lock:
+            timer = self.remove_namespace_timers.pop(namespace_name, None)
+        if timer is not None:
+            timer.cancel()
 
         namespace: Namespace = self.loaded_namespaces.get(namespace_name)
-        if namespace is not None and namespace in self.active_namespaces:
-            LOG.info(f"Removing namespace {namespace_name}")
-            self.core_bus.emit(Message("gui.namespace.removed",
-                                       data={"skill_id": namespace.skill_id}))
-            namespace_position = self.active_namespaces.index(namespace)
-            namespace.remove(namespace_position)
-            self.active_namespaces.remove(namespace)
+        with self._get_namespace_lock(namespace_name), self._state_lock:
+            namespace_position = self._get_active_position(namespace)
+            if namespace_position is not None:
+                LOG.info(f"Removing namespace {namespace_name}")
+                self._emit(Message("gui.namespace.removed",
+                                   data={"skill_id": namespace.skill_id}))
+                namespace.remove(namespace_position)
+                del self.active_namespaces[namespace_position]
 
         self._emit_namespace_displayed_event()
 
@@ -815,13 +1181,38 @@ class NamespaceManager:
         """
         Emit a `gui.namespace.displayed` Message to notify core of changes.
         """
-        if self.active_namespaces:
-            displaying_namespace = self.active_namespaces[0]
+        active_namespaces = list(self.active_namespaces)
+        if active_namespaces:
+            displaying_namespace = active_namespaces[0]
             message_data = dict(skill_id=displaying_namespace.skill_id)
             # TODO - no known listeners ?
-            self.core_bus.emit(
-                Message("gui.namespace.displayed", data=message_data)
-            )
+            self._emit(Message("gui.namespace.displayed", data=message_data))
+
+    def _emit(self, message: Message):
+        """
+        Queue a notification for the core bus. Notifications are emitted in
+        order by a background thread, so bus I/O never happens while holding
+        namespace locks.
+        @param message: Message to emit
+        """
+        if self._emitter is None:
+            with self._emitter_lock:
+                if self._emitter is None:
+                    self._emitter = Thread(target=self._run_emitter,
+                                           daemon=True)
+                    self._emitter.start()
+        self._emit_queue.put(message)
+
+    def _run_emitter(self):
+        """
+        Emit queued notifications to the core bus
+        """
+        while True:
+            message = self._emit_queue.get()
+            try:
+                self.core_bus.emit(message)
+            except Exception as e:
+                LOG.exception(f"Failed to emit {message.msg_type}: {e}")
 
     def handle_status_request(self, message: Message):
         """
@@ -847,7 +1238,8 @@ class NamespaceManager:
                 "namespace specified"
             )
         else:
-            with namespace_lock:
+            # only updates to the same namespace wait for each other
+            with self._get_namespace_lock(namespace_name):
                 self._update_namespace_data(namespace_name, message.data)
 
     def _update_namespace_data(self, namespace_name: str, data: dict):
@@ -857,11 +1249,16 @@ class NamespaceManager:
         @param data: the name and new value of one or more data attributes
         """
         namespace = self._ensure_namespace_exists(namespace_name)
-        for key, value in data.items():
-            if key not in RESERVED_KEYS and namespace.data.get(key) != value:
-                namespace.data[key] = value
-                if namespace in self.active_namespaces:
-                    namespace.load_data(key, value)
+        current = namespace.data
+        changed = {key: value for key, value in data.items()
+                   if key not in RESERVED_KEYS and current.get(key) != value}
+        if not changed:
+            return
+        current.update(changed)
+        namespace.invalidate_sync_cache()
+        if namespace in self.active_namespaces:
+            # all changed attributes are sent in one message
+            namespace.load_data_items(changed)
 
     def handle_client_connected(self, message: Message):
         """
@@ -875,10 +1272,7 @@ class NamespaceManager:
         framework = message.data.get("framework")  # new api
         if framework is None:
             qt = message.data.get("qt_version", 5)  # mycroft-gui api
-            if int(qt) == 6:
-                framework = "qt6"
-            else:
-                framework = "qt5"
+            framework = get_qt_framework(qt)
 
         LOG.info(f"GUI with ID {gui_id} connected to core message bus")
         websocket_config = get_gui_websocket_config()
@@ -898,17 +1292,21 @@ class NamespaceManager:
         pidx = message.data.get('page_number')
         LOG.info(f"GUI interacted with page in namespace {namespace_name}")
         namespace = self.loaded_namespaces.get(namespace_name)
+        if namespace is None:
+            return
 
-        if namespace and pidx is not None and pidx != namespace.page_number:
+        if pidx is not None and pidx != namespace.page_number:
             # update focused page
             namespace.page_gained_focus(pidx)
 
+        if namespace.persistent or namespace_name == self.idle_display_skill:
+            return
+
         # reschedule namespace timeout
-        if namespace_name != self.idle_display_skill and \
-                not namespace.persistent and \
-                self.remove_namespace_timers[namespace.skill_id]:
-            self.remove_namespace_timers[namespace.skill_id].cancel()
-            self._del_namespace_in_remove_timers(namespace.skill_id)
+        with self._state_lock:
+            timer = self.remove_namespace_timers.pop(namespace.skill_id, None)
+        if timer is not None:
+            timer.cancel()
             self._schedule_namespace_removal(namespace)
 
     def handle_page_gained_focus(self, message: Message):
@@ -933,12 +1331,13 @@ class NamespaceManager:
         Handles global back events from the GUI.
         @param message: the event sent by the GUI
         """
-        if not self.active_namespaces:
+        active_namespaces = list(self.active_namespaces)
+        if not active_namespaces:
             LOG.debug("received 'back' signal but there are no active namespaces, attempting to show homescreen")
             self.core_bus.emit(Message("homescreen.manager.show_active"))
             return
 
-        namespace_name = self.active_namespaces[0].skill_id
+        namespace_name = active_namespaces[0].skill_id
         namespace = self.loaded_namespaces.get(namespace_name)
         if namespace in self.active_namespaces:
             # prev page
@@ -948,21 +1347,20 @@ class NamespaceManager:
             else:
                 self.core_bus.emit(Message("homescreen.manager.show_active"))
 
-    def _del_namespace_in_remove_timers(self, namespace_name: str):
-        """
-        Delete namespace from remove_namespace_timers dict.
-        @param namespace_name: name of namespace to be deleted
-        """
-        if namespace_name in self.remove_namespace_timers:
-            del self.remove_namespace_timers[namespace_name]
-
     def _cache_system_resources(self):
         """
         Copy system GUI resources to the served file path
         """
         output_path = f"{GUI_CACHE_PATH}/system"
         if exists(output_path):
+            # copies keep the size and mtime of the original files
+            if _get_resource_manifest(output_path) == \
+                    _get_resource_manifest(self._system_res_dir):
+                LOG.debug(f"System resources in {output_path} are up to date")
+                return
             LOG.info(f"Removing existing system resources before updating")
             shutil.rmtree(output_path)
-        shutil.copytree(self._system_res_dir, output_path)
+        # resources are read-only, link them instead of copying file contents
+        shutil.copytree(self._system_res_dir, output_path,
+                        copy_function=_link_or_copy)
         LOG.debug(f"Copied system resources from {self._system_res_dir} to {output_path}")
@@ -77,3 +77,5 @@ class GUIService:
         Perform any GUI shutdown processes.
         """
         self.status.set_stopping()
+        if self.extension_manager:
+            self.extension_manager.shutdown()
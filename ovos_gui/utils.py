@@ -0,0 +1,14 @@
+import logging
+
+from ovos_utils.log import LOG
+
+
+def is_debug_enabled() -> bool:
+    """
+    Check if debug logs are emitted. Each `LOG` call inspects the stack to
+    name its logger, so per-message debug logs are skipped unless enabled.
+    """
+    level = LOG.level
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    return isinstance(level, int) and level <= logging.DEBUG
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import unittest
 from unittest.mock import patch, Mock
 from typing import List
@@ -19,16 +21,25 @@ class TestBus(unittest.TestCase):
         with self.assertRaises(KeyError):
             get_gui_websocket_config()
 
+    @patch("ovos_gui.bus.Configuration.set_config_watcher")
     @patch("ovos_gui.bus.Application.listen")
     @patch("ovos_gui.bus.create_daemon")
     @patch("ovos_gui.bus.ioloop")
-    def test_create_gui_service(self, ioloop, create_daemon, listen):
+    def test_create_gui_service(self, ioloop, create_daemon, listen,
+                                set_config_watcher):
         from ovos_gui.bus import create_gui_service
         ioloop_instance = Mock()
         ioloop.IOLoop.instance.return_value = ioloop_instance
         mock_nsmanager = Mock()
         application = create_gui_service(mock_nsmanager)
         create_daemon.assert_called_once_with(ioloop_instance.start)
+        for msg_type in ("configuration.updated", "configuration.patch",
+                         "configuration.patch.clear"):
+            mock_nsmanager.core_bus.on.assert_any_call(
+                msg_type, ovos_gui.bus._reset_default_framework)
+        # config file changes don't emit a bus message
+        set_config_watcher.assert_called_once_with(
+            ovos_gui.bus._reset_default_framework)
         listen.assert_called_once()
         self.assertEqual(application.settings.get("namespace_manager"),
                          mock_nsmanager)
@@ -41,7 +52,88 @@ class TestBus(unittest.TestCase):
         message = {"test": True}
 
         send_message_to_gui(message)
-        mock_client.send.assert_called_once_with(message)
+        mock_client.send_raw.assert_called_once()
+        payload = mock_client.send_raw.call_args[0][0]
+        self.assertEqual(json.loads(payload), message)
+
+        # payload is serialized once and shared by all clients
+        mock_client_2 = Mock()
+        handler.clients = [mock_client, mock_client_2]
+        send_message_to_gui(message)
+        self.assertIs(mock_client.send_raw.call_args[0][0],
+                      mock_client_2.send_raw.call_args[0][0])
+
+    @patch("ovos_gui.bus.GUIWebsocketHandler")
+    def test_gui_batch(self, handler):
+        from ovos_gui.bus import gui_batch, send_message_to_gui
+        mock_client = Mock()
+        mock_client_2 = Mock()
+        handler.clients = [mock_client, mock_client_2]
+
+        with gui_batch():
+            send_message_to_gui({"n": 1})
+            with gui_batch():
+                send_message_to_gui({"n": 2})
+            mock_client.send_raw.assert_not_called()
+            mock_client.send_batch.assert_not_called()
+        mock_client.send_raw.assert_not_called()
+        mock_client.send_batch.assert_called_once()
+        payloads = mock_client.send_batch.call_args[0][0]
+        self.assertEqual([json.loads(p) for p in payloads],
+                         [{"n": 1}, {"n": 2}])
+        self.assertEqual(mock_client_2.send_batch.call_args[0][0], payloads)
+
+        # messages are sent immediately outside a batch
+        send_message_to_gui({"n": 3})
+        mock_client.send_raw.assert_called_once()
+
+    def test_get_qt_framework(self):
+        from ovos_gui.bus import get_qt_framework
+        self.assertEqual(get_qt_framework(5), "qt5")
+        self.assertEqual(get_qt_framework(6), "qt6")
+        self.assertEqual(get_qt_framework("6"), "qt6")
+        self.assertEqual(get_qt_framework(6.0), "qt6")
+        self.assertEqual(get_qt_framework(4), "qt5")
+
+    @patch("ovos_gui.bus.Configuration")
+    def test_get_default_framework(self, configuration):
+        from ovos_gui.bus import _get_default_framework, \
+            _reset_default_framework
+        _reset_default_framework()
+        configuration.return_value = {"gui": {"default_qt_version": 6}}
+        self.assertEqual(_get_default_framework(), "qt6")
+        configuration.return_value = {}
+        # config is only read once
+        self.assertEqual(_get_default_framework(), "qt6")
+        configuration.assert_called_once()
+
+        # config changes are picked up after a reset
+        _reset_default_framework()
+        self.assertEqual(_get_default_framework(), "qt5")
+        _reset_default_framework()
+
+    def test_deserialize(self):
+        from ovos_gui.bus import _deserialize
+        serialized = '{"type": "mycroft.session.set", "namespace": "test", ' \
+                     '"data": {"key": "välue"}}'
+        expected = ("mycroft.session.set",
+                    {"namespace": "test", "data": {"key": "välue"}})
+        self.assertEqual(_deserialize(serialized), expected)
+        self.assertEqual(_deserialize(serialized.encode("utf-8")), expected)
+        with patch("ovos_gui.bus.orjson", None):
+            self.assertEqual(_deserialize(serialized), expected)
+            self.assertEqual(_deserialize(serialized.encode("utf-8")),
+                             expected)
+
+    def test_serialize_message(self):
+        from ovos_gui.bus import serialize_message
+        message = {"type": "mycroft.session.set", "namespace": "test",
+                   "data": {"key": "välue"}}
+        payload = serialize_message(message)
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(json.loads(payload), message)
+        with patch("ovos_gui.bus.orjson", None):
+            self.assertEqual(json.loads(serialize_message(message)), message)
 
     @patch("ovos_gui.bus.GUIWebsocketHandler")
     def test_determine_if_gui_connected(self, handler):
@@ -51,6 +143,26 @@ class TestBus(unittest.TestCase):
         handler.clients = [mock_client]
         self.assertTrue(determine_if_gui_connected())
 
+    def test_get_gui_clients(self):
+        from ovos_gui.bus import get_gui_clients, GUIWebsocketHandler
+        test = self
+
+        class _Clients(set):
+            def __iter__(self):
+                # open and on_close can't change the set during the copy
+                test.assertTrue(GUIWebsocketHandler.clients_lock.locked())
+                return super().__iter__()
+
+        real_clients = GUIWebsocketHandler.clients
+        client = Mock()
+        GUIWebsocketHandler.clients = _Clients([client])
+        try:
+            clients = get_gui_clients()
+        finally:
+            GUIWebsocketHandler.clients = real_clients
+        self.assertEqual(clients, [client])
+        self.assertFalse(GUIWebsocketHandler.clients_lock.locked())
+
 
 class TestGUIWebsocketHandler(unittest.TestCase):
     mock_nsmanager = Mock()
@@ -109,20 +221,92 @@ class TestGUIWebsocketHandler(unittest.TestCase):
 
 
     def test_synchronize(self):
-        # TODO
-        pass
+        real_send_raw = self.handler.send_raw
+        self.handler.send_raw = Mock()
+        namespace_1 = Mock(skill_id="skill_1")
+        namespace_1.get_sync_frames.return_value = [b"pages_1", b"data_1"]
+        namespace_2 = Mock(skill_id="skill_2")
+        namespace_2.get_sync_frames.return_value = [b"pages_2"]
+        self.mock_nsmanager.active_namespaces = [namespace_1, namespace_2]
+        self.handler._framework = "qt5"
+
+        self.handler.synchronize()
+        namespace_1.get_sync_frames.assert_called_once_with("qt5")
+        namespace_2.get_sync_frames.assert_called_once_with("qt5")
+        sent = [c[0][0] for c in self.handler.send_raw.call_args_list]
+        self.assertEqual(len(sent), 5)
+        self.assertEqual(json.loads(sent[0]),
+                         {"type": "mycroft.session.list.insert",
+                          "namespace": "mycroft.system.active_skills",
+                          "position": 0,
+                          "data": [{"skill_id": "skill_1"}]})
+        self.assertEqual(sent[1:3], [b"pages_1", b"data_1"])
+        self.assertEqual(json.loads(sent[3])["position"], 1)
+        self.assertEqual(sent[4], b"pages_2")
+
+        self.mock_nsmanager.active_namespaces = []
+        self.handler.send_raw = real_send_raw
 
     def test_on_message(self):
-        # TODO
-        pass
+        core_bus = self.mock_nsmanager.core_bus
+        core_bus.reset_mock()
+        self.handler._framework = "qt5"
 
-    def test_write_message(self):
-        # TODO
-        pass
+        self.handler.on_message(json.dumps(
+            {"type": "mycroft.session.set",
+             "namespace": "skill.test",
+             "data": {"key": "value"}}))
+        message = core_bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "skill.test.set")
+        self.assertEqual(message.data, {"key": "value"})
+        self.assertEqual(message.context, {"gui_framework": "qt5"})
+
+        self.handler.on_message(json.dumps(
+            {"type": "mycroft.events.triggered",
+             "namespace": "skill.test",
+             "event_name": "page_gained_focus",
+             "parameters": {"number": 1, "skillId": "skill.test"}}))
+        message = core_bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "gui.page_gained_focus")
+        self.assertEqual(message.data, {"namespace": "skill.test",
+                                        "page_number": 1,
+                                        "skill_id": "skill.test"})
+
+        self.handler.on_message(json.dumps(
+            {"type": "mycroft.events.triggered",
+             "namespace": "skill.test",
+             "event_name": "button.pressed",
+             "parameters": {"button": "ok"}}))
+        message = core_bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "skill.test.button.pressed")
+        self.assertEqual(message.data, {"button": "ok"})
+
+        self.handler.on_message(json.dumps(
+            {"type": "mycroft.gui.connected", "gui_id": "test",
+             "framework": "qt6"}))
+        message = core_bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "mycroft.gui.connected")
+        self.assertEqual(self.handler.framework, "qt6")
+        self.assertEqual(message.context, {"gui_framework": "qt6"})
+        self.handler._framework = "qt5"
+
+        # binary frames
+        self.handler.on_message(json.dumps(
+            {"type": "mycroft.session.set",
+             "namespace": "skill.test",
+             "data": {"key": "välue"}}).encode("utf-8"))
+        message = core_bus.emit.call_args[0][0]
+        self.assertEqual(message.msg_type, "skill.test.set")
+        self.assertEqual(message.data, {"key": "välue"})
+
+        # messages not in spec are not forwarded
+        core_bus.reset_mock()
+        self.handler.on_message(json.dumps({"type": "unknown"}))
+        core_bus.emit.assert_not_called()
 
     def test_send_gui_pages(self):
-        real_send = self.handler.send
-        self.handler.send = Mock()
+        real_send_raw = self.handler.send_raw
+        self.handler.send_raw = Mock()
         test_ns = "test_namespace"
         test_pos = 0
 
@@ -137,7 +321,9 @@ class TestGUIWebsocketHandler(unittest.TestCase):
         self.handler.send_gui_pages([page_1, page_2], test_ns, test_pos)
         page_1.get_uri.assert_called_once_with("qt5")
         page_2.get_uri.assert_called_once_with("qt5")
-        self.handler.send.assert_called_once_with(
+        self.handler.send_raw.assert_called_once()
+        self.assertEqual(
+            json.loads(self.handler.send_raw.call_args[0][0]),
             {"type": "mycroft.gui.list.insert",
              "namespace": test_ns,
              "position": test_pos,
@@ -148,17 +334,163 @@ class TestGUIWebsocketHandler(unittest.TestCase):
         self.handler.send_gui_pages([page_2, page_1], test_ns, test_pos)
         page_1.get_uri.assert_called_with("qt6")
         page_2.get_uri.assert_called_with("qt6")
-        self.handler.send.assert_called_with(
+        self.assertEqual(
+            json.loads(self.handler.send_raw.call_args[0][0]),
             {"type": "mycroft.gui.list.insert",
              "namespace": test_ns,
              "position": test_pos,
              "data": [{"url": "page_2", "page": "p2"}, {"url": "page_1", "page": "p1"}]})
 
-        self.handler.send = real_send
+        # namespaces are escaped
+        self.handler.send_gui_pages([page_1], 'test"namespace', 0)
+        self.assertEqual(
+            json.loads(self.handler.send_raw.call_args[0][0])["namespace"],
+            'test"namespace')
+
+        self.handler.send_raw = real_send_raw
 
     def test_send(self):
-        # TODO
-        pass
+        real_send_raw = self.handler.send_raw
+        self.handler.send_raw = Mock()
+        message = {"type": "mycroft.session.set",
+                   "namespace": "test",
+                   "data": {"key": "välue"}}
+        self.handler.send(message)
+        payload = self.handler.send_raw.call_args[0][0]
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(json.loads(payload), message)
+
+        self.handler.send_raw = real_send_raw
+
+    def test_send_raw(self):
+        from ovos_gui.bus import GUIWebsocketHandler
+        handler = GUIWebsocketHandler()
+        handler.close = Mock()
+
+        # connection not open yet
+        handler.send_raw(b"{}")
+
+        # messages are queued from the event loop
+        handler._loop = Mock()
+        handler._queue = asyncio.Queue()
+        handler.send_raw(b"{}")
+        handler._loop.call_soon_threadsafe.assert_called_once_with(
+            handler._flush_pending)
+        # a burst only wakes the event loop once
+        handler.send_raw(b"[]")
+        handler._loop.call_soon_threadsafe.assert_called_once()
+        handler._flush_pending()
+        self.assertEqual(handler._queue.get_nowait(), b"{}")
+        self.assertEqual(handler._queue.get_nowait(), b"[]")
+        self.assertEqual(handler._pending, [])
+        handler.send_raw(b"{}")
+        self.assertEqual(handler._loop.call_soon_threadsafe.call_count, 2)
+
+        # unresponsive clients are disconnected
+        handler._queue = asyncio.Queue(maxsize=1)
+        handler._enqueue(b"1")
+        handler.close.assert_not_called()
+        handler._enqueue(b"2")
+        handler.close.assert_called_once()
+        self.assertEqual(handler._queue.get_nowait(), b"1")
+
+        # closed connections drop messages instead of queueing them
+        handler._relay = Mock()
+        handler.on_close()
+        handler._relay.cancel.assert_called_once()
+        handler._loop.reset_mock()
+        handler.send_raw(b"{}")
+        handler.send_batch([b"{}", b"[]"])
+        handler._loop.call_soon_threadsafe.assert_not_called()
+        # messages handed over before the close are not queued either
+        handler._pending = [b"{}"]
+        handler._flush_pending()
+        self.assertTrue(handler._queue.empty())
+
+    def test_send_batch(self):
+        from ovos_gui.bus import GUIWebsocketHandler, gui_batch
+        handler = GUIWebsocketHandler()
+        other = GUIWebsocketHandler()
+        handler._loop = Mock()
+        other._loop = Mock()
+        real_clients = GUIWebsocketHandler.clients
+        GUIWebsocketHandler.clients = [handler, other]
+        try:
+            # client specific messages are only sent to that client
+            with gui_batch():
+                handler.send_raw(b"1")
+                handler.send_raw(b"2")
+            handler._loop.call_soon_threadsafe.assert_called_once_with(
+                handler._flush_pending)
+            self.assertEqual(handler._pending, [b"1", b"2"])
+            other._loop.call_soon_threadsafe.assert_not_called()
+        finally:
+            GUIWebsocketHandler.clients = real_clients
+
+        # all messages are queued in order
+        handler._queue = asyncio.Queue()
+        handler._enqueue(b"1", b"2")
+        self.assertEqual(handler._queue.get_nowait(), b"1")
+        self.assertEqual(handler._queue.get_nowait(), b"2")
+
+    def test_drain(self):
+        from ovos_gui.bus import GUIWebsocketHandler
+        handler = GUIWebsocketHandler()
+        handler.close = Mock()
+        handler.write_timeout = 0.01
+
+        async def _run(write_message):
+            handler._queue = asyncio.Queue()
+            handler._queue.put_nowait(b"1")
+            handler._queue.put_nowait(b"2")
+            with patch("tornado.websocket.WebSocketHandler.write_message",
+                       write_message):
+                await handler._drain()
+
+        # closed connections stop the relay
+        from tornado.websocket import WebSocketClosedError
+        write_message = Mock(side_effect=WebSocketClosedError)
+        asyncio.run(_run(write_message))
+        write_message.assert_called_once()
+        handler.close.assert_not_called()
+
+        # so do writes failing after they were started
+        async def closed(*args, **kwargs):
+            raise WebSocketClosedError()
+        write_message = Mock(side_effect=closed)
+        asyncio.run(_run(write_message))
+        self.assertEqual(write_message.call_count, 2)
+        handler.close.assert_not_called()
+
+        # other write errors close the connection
+        async def failed(*args, **kwargs):
+            raise OSError("broken pipe")
+        write_message = Mock(side_effect=failed)
+        asyncio.run(_run(write_message))
+        handler.close.assert_called_once()
+        handler.close.reset_mock()
+
+        # stalled writes close the connection
+        async def stalled(*args, **kwargs):
+            await asyncio.sleep(1)
+        write_message = Mock(side_effect=stalled)
+        asyncio.run(_run(write_message))
+        self.assertEqual(write_message.call_count, 2)
+        handler.close.assert_called_once()
+
+        # queued messages are written together, in order
+        async def written(*args, **kwargs):
+            pass
+
+        async def _run_until_idle(write_message):
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(_run(write_message), 0.05)
+
+        write_message = Mock(side_effect=written)
+        asyncio.run(_run_until_idle(write_message))
+        self.assertEqual([c[0][0] for c in write_message.call_args_list],
+                         [b"1", b"2"])
+        self.assertEqual(handler.close.call_count, 1)
 
     def test_check_origin(self):
         self.assertTrue(self.handler.check_origin("test"))
@@ -2,9 +2,10 @@ import unittest
 from unittest.mock import patch, Mock
 
 import ovos_gui.extensions
+from ovos_bus_client.message import Message
 from ovos_utils.fakebus import FakeBus
 from ovos_gui.homescreen import HomescreenManager
-from ovos_gui.extensions import ExtensionsManager
+from ovos_gui.extensions import ExtensionsManager, ExtensionMeta
 from .mocks import base_config
 
 PATCH_MODULE = "ovos_gui.extensions"
@@ -39,17 +40,71 @@ class TestExtensionManager(unittest.TestCase):
         self.assertEqual(self.extension_manager.homescreen_manager.bus, self.bus)
         self.assertIsInstance(self.extension_manager.active_extension, str)
 
-    @patch("ovos_gui.extensions.OVOSGuiFactory.create")
-    def test_activate_extension(self, create):
+    @patch("ovos_plugin_manager.gui.OVOSGuiFactory.get_class")
+    def test_activate_extension(self, get_class):
+        from ovos_gui.extensions import _get_plugin_class
+        _get_plugin_class.cache_clear()
         mock_extension = Mock()
         mock_extension.preload_gui = False
         mock_extension.permanent = True
         # TODO: Test preload/permanent combinations
-        create.return_value = mock_extension
+        get_class.return_value = Mock(return_value=mock_extension)
         self.extension_manager.activate_extension("smartspeaker")
-        create.assert_called_once()
-        # TODO: Check call for mapped plugin name
+        get_class.assert_called_once_with(
+            {"module": "ovos-gui-plugin-shell-companion"})
+        get_class.return_value.assert_called_once()
         self.assertEqual(self.extension_manager.extension, mock_extension)
-        mock_extension.bind_homescreen.assert_called_once()
+        self.assertEqual(self.extension_manager.extension_meta,
+                         ExtensionMeta(preload_gui=False, permanent=True))
+        # extensions share the manager's HomescreenManager
+        mock_extension.bind_homescreen.assert_called_once_with(
+            self.extension_manager.homescreen_manager)
         # TODO: Test messagebus Messages
 
+        # plugin class is only looked up once
+        self.extension_manager.activate_extension("smartspeaker")
+        get_class.assert_called_once()
+        self.assertEqual(get_class.return_value.call_count, 2)
+
+        # handlers of the replaced extension are removed
+        mock_extension.shutdown.assert_called_once()
+        listeners = self.bus.ee.listeners("mycroft.gui.connected")
+        self.assertEqual(
+            listeners.count(self.extension_manager.signal_available), 1)
+
+        # availability is only announced on the first connection
+        available = []
+        self.bus.on("mycroft.gui.available", available.append)
+        self.bus.emit(Message("mycroft.gui.connected"))
+        self.bus.emit(Message("mycroft.gui.connected"))
+        self.assertEqual(len(available), 1)
+        self.assertEqual(available[0].data, {"permanent": True})
+        self.assertNotIn(self.extension_manager.signal_available,
+                         self.bus.ee.listeners("mycroft.gui.connected"))
+        self.bus.remove("mycroft.gui.available", available.append)
+        _get_plugin_class.cache_clear()
+
+    @patch("ovos_plugin_manager.gui.OVOSGuiFactory.get_class")
+    def test_activate_extension_fallback(self, get_class):
+        from ovos_gui.extensions import _get_plugin_class
+        _get_plugin_class.cache_clear()
+        generic = Mock()
+        generic.return_value.preload_gui = True
+        generic.return_value.permanent = False
+
+        def _get_class(config):
+            if config["module"] == "generic":
+                return generic
+            raise ImportError(config["module"])
+
+        get_class.side_effect = _get_class
+        self.extension_manager.activate_extension("missing-plugin")
+        self.assertEqual(self.extension_manager.extension,
+                         generic.return_value)
+        self.assertEqual(get_class.call_count, 2)
+
+        # the generic fallback class is resolved only once
+        self.extension_manager.activate_extension("missing-plugin")
+        self.assertEqual(get_class.call_count, 3)
+        self.assertEqual(generic.call_count, 2)
+        _get_plugin_class.cache_clear()
@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 from ovos_bus_client.message import Message
 from ovos_utils.fakebus import FakeBus
@@ -11,22 +11,134 @@ class TestHomescreenManager(unittest.TestCase):
     bus = FakeBus()
     homescreen_manager = HomescreenManager(bus)
 
+    def setUp(self):
+        # tests patch Configuration, don't reuse a cached value
+        self.homescreen_manager.handle_config_updated()
+
+    def tearDown(self):
+        # don't let a pending display check run into the next test
+        with self.homescreen_manager._add_lock:
+            if self.homescreen_manager._add_timer is not None:
+                self.homescreen_manager._add_timer.cancel()
+                self.homescreen_manager._add_timer = None
+            self.homescreen_manager._pending_adds = set()
+        self._flush_activation()
+
+    def _flush_activation(self):
+        # emit a queued activation now instead of waiting for the timer
+        with self.homescreen_manager._activation_lock:
+            if self.homescreen_manager._activation_timer is not None:
+                self.homescreen_manager._activation_timer.cancel()
+                self.homescreen_manager._activation_timer = None
+        self.homescreen_manager._emit_pending_activation()
+
     def test_00_homescreen_manager_init(self):
         self.assertEqual(self.homescreen_manager.bus, self.bus)
-        self.assertIsInstance(self.homescreen_manager.homescreens, list)
-        # TODO: Test messagebus handlers
+        self.assertIsInstance(self.homescreen_manager.homescreens, dict)
+        for msg_type, handler in \
+                self.homescreen_manager._bus_handlers.items():
+            self.assertIn(handler, self.bus.ee.listeners(msg_type))
 
-    def test_add_homescreen(self):
-        # TODO
-        pass
+    @patch("ovos_gui.homescreen.dig_for_message")
+    def test_run(self, dig):
+        bus = FakeBus()
+        manager = self.HomescreenManager(bus)
+        manager.show_homescreen = Mock()
+        reloads = []
+        bus.on("homescreen.manager.reload.list", reloads.append)
+        manager.run()
+        self.assertEqual(len(reloads), 1)
+        message = manager.show_homescreen.call_args[0][0]
+        self.assertEqual(message.msg_type, "homescreen.manager.show_active")
+        dig.assert_not_called()
+        manager.shutdown()
+
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_shutdown(self, config):
+        config.return_value = {"gui": {"idle_display_skill": "test"}}
+        bus = FakeBus()
+        manager = self.HomescreenManager(bus)
+        manager.add_homescreen(Message("", {"id": "test"}))
+        timer = manager._add_timer
+        manager._schedule_activation(Message("test"))
+        activation_timer = manager._activation_timer
+        manager.shutdown()
+        for msg_type in manager._bus_handlers:
+            self.assertEqual(bus.ee.listeners(msg_type), [])
+        # pending checks are cancelled
+        self.assertTrue(timer.finished.is_set())
+        self.assertIsNone(manager._add_timer)
+        self.assertEqual(manager._pending_adds, set())
+        self.assertTrue(activation_timer.finished.is_set())
+        self.assertIsNone(manager._activation_timer)
+        self.assertIsNone(manager._pending_activation)
+
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_add_homescreen(self, config):
+        config.return_value = {"gui": {}}
+        homescreen = {"id": "test_homescreen", "class": "test"}
+        self.homescreen_manager.add_homescreen(Message("", homescreen))
+        self.assertEqual(self.homescreen_manager.homescreens,
+                         {"test_homescreen": homescreen})
+        # homescreens are only added once
+        self.homescreen_manager.add_homescreen(
+            Message("", {"id": "test_homescreen", "class": "other"}))
+        self.assertEqual(self.homescreen_manager.homescreens,
+                         {"test_homescreen": homescreen})
+        # no homescreen configured, no display check is queued
+        self.assertIsNone(self.homescreen_manager._add_timer)
+        self.assertEqual(self.homescreen_manager._pending_adds, set())
+        self.homescreen_manager.homescreens = dict()
+
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_add_homescreen_burst(self, config):
+        config.return_value = {"gui": {"idle_display_skill": "two"}}
+        manager = self.homescreen_manager
+        real_show = manager.show_homescreen_on_add
+        manager.show_homescreen_on_add = Mock()
+        for homescreen_id in ("one", "two", "three"):
+            manager.add_homescreen(Message("", {"id": homescreen_id}))
+        # registrations are checked together, once
+        timer = manager._add_timer
+        timer.cancel()
+        manager._flush_pending_adds()
+        manager.show_homescreen_on_add.assert_called_once_with("two")
+        self.assertIsNone(manager._add_timer)
+        self.assertEqual(manager._pending_adds, set())
+
+        # the active homescreen was not added
+        manager.show_homescreen_on_add.reset_mock()
+        manager.add_homescreen(Message("", {"id": "four"}))
+        manager._add_timer.cancel()
+        manager._flush_pending_adds()
+        manager.show_homescreen_on_add.assert_not_called()
+
+        manager.show_homescreen_on_add = real_show
+        manager.homescreens = dict()
 
     def test_remove_homescreen(self):
-        # TODO
-        pass
+        self.homescreen_manager.homescreens = {"one": {"id": "one"},
+                                               "two": {"id": "two"}}
+        self.homescreen_manager.remove_homescreen(Message("", {"id": "one"}))
+        self.assertEqual(self.homescreen_manager.homescreens,
+                         {"two": {"id": "two"}})
+        # removing a missing homescreen is a no-op
+        self.homescreen_manager.remove_homescreen(Message("", {"id": "one"}))
+        self.assertEqual(self.homescreen_manager.homescreens,
+                         {"two": {"id": "two"}})
+        self.homescreen_manager.homescreens = dict()
 
     def test_get_homescreen(self):
-        # TODO
-        pass
+        self.homescreen_manager.homescreens = {"one": {"id": "one"},
+                                               "two": {"id": "two"}}
+        responses = []
+        self.bus.on("homescreen.manager.list.response", responses.append)
+        self.homescreen_manager.get_homescreens(
+            Message("homescreen.manager.list"))
+        self.assertEqual(responses[0].data,
+                         {"homescreens": [{"id": "one"}, {"id": "two"}]})
+        self.bus.remove("homescreen.manager.list.response", responses.append)
+        self.homescreen_manager.homescreens = dict()
 
     def test_handle_get_active_homescreen(self):
         # TODO
@@ -40,7 +152,15 @@ class TestHomescreenManager(unittest.TestCase):
     def test_get_active_homescreen(self, config):
         config.return_value = {"gui": {"idle_display_skill": "test"}}
         self.assertIsNone(self.homescreen_manager.get_active_homescreen())
-        # TODO: Mock `homescreens` and get a value here
+        self.homescreen_manager.homescreens = {"test": {"id": "test"}}
+        self.assertEqual(self.homescreen_manager.get_active_homescreen(),
+                         "test")
+
+        # the active homescreen is only logged when it changes
+        with patch("ovos_gui.homescreen.LOG") as log:
+            self.homescreen_manager.get_active_homescreen()
+            log.info.assert_not_called()
+        self.homescreen_manager.homescreens = dict()
 
     @patch("ovos_gui.homescreen.update_mycroft_config")
     def test_set_active_homescreen(self, update_config):
@@ -50,13 +170,67 @@ class TestHomescreenManager(unittest.TestCase):
             {"gui": {"idle_display_skill": test_id}},
             bus=self.homescreen_manager.bus)
 
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_config_cache(self, config):
+        config.return_value = {"gui": {"idle_display_skill": "test"}}
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "test")
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "test")
+        config.assert_called_once()
+
+        # patched config is applied without reading config again
+        self.bus.emit(Message("configuration.patch", {
+            "config": {"gui": {"idle_display_skill": "patched"}}}))
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "patched")
+        self.bus.emit(Message("configuration.patch", {
+            "config": {"gui": {"extension": "generic"}}}))
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "patched")
+        config.assert_called_once()
+
+        # updated config is read again
+        config.return_value = {"gui": {"idle_display_skill": "updated"}}
+        self.bus.emit(Message("configuration.updated"))
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "updated")
+        self.assertEqual(config.call_count, 2)
+
+        # so is config after patches are cleared
+        config.return_value = {"gui": {"idle_display_skill": "cleared"}}
+        self.bus.emit(Message("configuration.patch.clear"))
+        self.assertEqual(self.homescreen_manager._get_idle_display_skill(),
+                         "cleared")
+
+        # config files changed on disk don't emit a bus message
+        bus = FakeBus()
+        manager = self.HomescreenManager(bus)
+        config.set_config_watcher.assert_called_once_with(
+            manager.handle_config_updated)
+        self.assertEqual(manager._get_idle_display_skill(), "cleared")
+        config.return_value = {"gui": {"idle_display_skill": "edited"}}
+        config.set_config_watcher.call_args[0][0]()
+        self.assertEqual(manager._get_idle_display_skill(), "edited")
+        manager.shutdown()
+
     def test_reload_homescreens_list(self):
         # TODO
         pass
 
-    def test_show_homescreen_on_add(self):
-        # TODO
-        pass
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_show_homescreen_on_add(self, config):
+        config.return_value = {"gui": {"idle_display_skill": "active"}}
+        emitted = []
+        self.bus.on("homescreen.manager.activate.display", emitted.append)
+        self.homescreen_manager.show_homescreen_on_add("other")
+        self._flush_activation()
+        self.assertEqual(emitted, [])
+        self.homescreen_manager.show_homescreen_on_add("active")
+        self._flush_activation()
+        self.assertEqual(emitted[0].data, {"homescreen_id": "active"})
+        self.bus.remove("homescreen.manager.activate.display",
+                        emitted.append)
 
     @patch("ovos_gui.homescreen.Configuration")
     @patch("ovos_gui.homescreen.update_mycroft_config")
@@ -67,6 +241,33 @@ class TestHomescreenManager(unittest.TestCase):
             {"gui": {"idle_display_skill": None}},
             bus=self.homescreen_manager.bus)
 
-    def test_show_homescreen(self):
-        # TODO
-        pass
+    @patch("ovos_gui.homescreen.Configuration")
+    def test_show_homescreen(self, config):
+        config.return_value = {"gui": {"idle_display_skill": "active"}}
+        emitted = []
+        self.bus.on("homescreen.manager.activate.display", emitted.append)
+        # configured homescreen is not loaded
+        self.homescreen_manager.show_homescreen(Message("test"))
+        self._flush_activation()
+        self.assertEqual(emitted, [])
+
+        # back-to-back requests emit the latest one, once
+        self.homescreen_manager.homescreens = {"active": {"id": "active"}}
+        self.homescreen_manager.show_homescreen(
+            Message("test", context={"source": "first"}))
+        self.homescreen_manager.show_homescreen(
+            Message("test", context={"source": "test"}))
+        self._flush_activation()
+        self.assertEqual(len(emitted), 1)
+        self.assertEqual(emitted[0].data, {"homescreen_id": "active"})
+        self.assertEqual(emitted[0].context["source"], "test")
+
+        # without a Message to forward, a new one is emitted
+        with patch("ovos_gui.homescreen.dig_for_message") as dig:
+            dig.return_value = None
+            self.homescreen_manager.show_homescreen()
+        self._flush_activation()
+        self.assertEqual(emitted[1].data, {"homescreen_id": "active"})
+        self.bus.remove("homescreen.manager.activate.display",
+                        emitted.append)
+        self.homescreen_manager.homescreens = dict()
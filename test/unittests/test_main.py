@@ -0,0 +1,43 @@
+import asyncio
+import sys
+import unittest
+from importlib.util import find_spec
+from threading import Thread
+from unittest.mock import patch
+
+
+class TestMain(unittest.TestCase):
+    def test_install_uvloop_not_installed(self):
+        from ovos_gui.__main__ import install_uvloop
+        policy = asyncio.get_event_loop_policy()
+        # uvloop is an optional dependency, the default loop is kept
+        with patch.dict(sys.modules, {"uvloop": None}), \
+                patch("ovos_gui.__main__.AsyncIOMainLoop") as main_loop, \
+                patch("ovos_gui.__main__.asyncio.set_event_loop") as set_loop:
+            self.assertFalse(install_uvloop())
+        main_loop.assert_not_called()
+        set_loop.assert_not_called()
+        self.assertIs(asyncio.get_event_loop_policy(), policy)
+
+    @unittest.skipUnless(find_spec("uvloop"), "uvloop is not installed")
+    def test_install_uvloop(self):
+        import uvloop
+        from tornado.ioloop import IOLoop
+        from ovos_gui.__main__ import install_uvloop
+        policy = asyncio.get_event_loop_policy()
+        result = dict()
+
+        def _install():
+            # only the calling thread's event loop is replaced
+            result["installed"] = install_uvloop()
+            io_loop = IOLoop.current()
+            result["loop"] = io_loop.asyncio_loop
+            io_loop.close()
+            io_loop.asyncio_loop.close()
+
+        thread = Thread(target=_install)
+        thread.start()
+        thread.join()
+        self.assertTrue(result["installed"])
+        self.assertIsInstance(result["loop"], uvloop.Loop)
+        self.assertIs(asyncio.get_event_loop_policy(), policy)
@@ -13,14 +13,18 @@
 # limitations under the License.
 #
 """Tests for the GUI namespace helper class."""
-from os.path import join, isdir, isfile
+import json
+from os import remove
+from os.path import join, isdir, isfile, samefile
 from shutil import rmtree
+from threading import Event, Thread
 from unittest import TestCase, mock
 from unittest.mock import Mock
 
 from ovos_bus_client.message import Message
 from ovos_utils.fakebus import FakeBus
 
+from ovos_gui.bus import build_pages_payload, serialize_pages
 from ovos_gui.constants import GUI_CACHE_PATH
 from ovos_gui.namespace import Namespace
 from ovos_gui.page import GuiPage
@@ -30,16 +34,57 @@ PATCH_MODULE = "ovos_gui.namespace"
 
 class TestNamespaceFunctions(TestCase):
     def test_validate_page_message(self):
-        pass
-        # TODO
-
-    def test_get_idle_display_config(self):
-        pass
-        # TODO
-
-    def test_get_active_gui_extension(self):
-        pass
-        # TODO
+        from ovos_gui.namespace import _validate_page_message
+        self.assertTrue(_validate_page_message(Message(
+            "gui.page.show", {"__from": "foo", "page_names": ["bar"]})))
+        self.assertFalse(_validate_page_message(Message(
+            "gui.page.show", {"page_names": ["bar"]})))
+        self.assertFalse(_validate_page_message(Message(
+            "gui.page.delete", {"__from": "foo"})))
+        self.assertFalse(_validate_page_message(Message(
+            "gui.page.delete", {"__from": "foo", "page_names": "bar"})))
+
+    def test_link_or_copy(self):
+        from ovos_gui.namespace import _link_or_copy
+        src = join(GUI_CACHE_PATH, "link_test_src")
+        dst = join(GUI_CACHE_PATH, "link_test_dst")
+        with open(src, "w") as f:
+            f.write("test")
+        try:
+            self.assertEqual(_link_or_copy(src, dst), dst)
+            self.assertTrue(samefile(src, dst))
+            remove(dst)
+            # files are copied when they can't be linked
+            with mock.patch(PATCH_MODULE + ".os.link",
+                            side_effect=OSError):
+                _link_or_copy(src, dst)
+            self.assertFalse(samefile(src, dst))
+            with open(dst) as f:
+                self.assertEqual(f.read(), "test")
+        finally:
+            for path in (src, dst):
+                if isfile(path):
+                    remove(path)
+
+    @mock.patch(PATCH_MODULE + ".Configuration")
+    def test_get_idle_display_config(self, config):
+        from ovos_gui.namespace import _get_idle_display_config
+        config.return_value = {"gui": {"idle_display_skill": "test"}}
+        self.assertEqual(_get_idle_display_config(), "test")
+        # a provided config section is not read again
+        self.assertEqual(
+            _get_idle_display_config({"idle_display_skill": "other"}),
+            "other")
+        self.assertIsNone(_get_idle_display_config({}))
+        config.assert_called_once()
+
+    @mock.patch(PATCH_MODULE + ".Configuration")
+    def test_get_active_gui_extension(self, config):
+        from ovos_gui.namespace import _get_active_gui_extension
+        config.return_value = {"gui": {"extension": "Bigscreen"}}
+        self.assertEqual(_get_active_gui_extension(), "bigscreen")
+        self.assertEqual(_get_active_gui_extension({}), "generic")
+        config.assert_called_once()
 
 
 class TestNamespace(TestCase):
@@ -110,10 +155,77 @@ class TestNamespace(TestCase):
             self.namespace.load_data(name="foo", value="bar")
             send_message_mock.assert_called_with(load_data_message)
 
+    def test_load_data_items(self):
+        load_data_message = dict(
+            type="mycroft.session.set",
+            namespace="foo",
+            data=dict(foo="bar", baz=1)
+        )
+        patch_function = PATCH_MODULE + ".send_message_to_gui"
+        with mock.patch(patch_function) as send_message_mock:
+            self.namespace.load_data_items(dict(foo="bar", baz=1))
+            send_message_mock.assert_called_once_with(load_data_message)
+
     def test_unload_data(self):
         # TODO
         pass
 
+    def test_get_sync_frames(self):
+        page = GuiPage(name="bar", persistent=True, duration=0)
+        page.get_uri = Mock(return_value="bar_uri")
+        self.namespace.pages = [page]
+        self.namespace.data = {"key": "value", "other": 1}
+
+        frames = self.namespace.get_sync_frames("qt5")
+        self.assertEqual([json.loads(f) for f in frames],
+                         [{"type": "mycroft.gui.list.insert",
+                           "namespace": "foo",
+                           "position": 0,
+                           "data": [{"url": "bar_uri", "page": "bar"}]},
+                          {"type": "mycroft.session.set",
+                           "namespace": "foo",
+                           "data": {"key": "value", "other": 1}}])
+        # cached per framework
+        self.assertIs(self.namespace.get_sync_frames("qt5"), frames)
+        page.get_uri.assert_called_once_with("qt5")
+        self.namespace.get_sync_frames("qt6")
+        page.get_uri.assert_called_with("qt6")
+
+        # page URIs are kept when only data changes
+        self.namespace.data = {"key": "other"}
+        frames = self.namespace.get_sync_frames("qt5")
+        self.assertEqual(json.loads(frames[1])["data"], {"key": "other"})
+        self.assertEqual(page.get_uri.call_count, 2)
+
+        # pages that can not be resolved yet are not cached
+        page.get_uri.return_value = None
+        self.namespace.pages = [page]
+        self.assertEqual(self.namespace.get_page_urls("qt5"), [None])
+        page.get_uri.return_value = "bar_uri"
+        self.assertEqual(self.namespace.get_page_urls("qt5"), ["bar_uri"])
+        self.assertEqual(page.get_uri.call_count, 4)
+
+        # cache is invalidated when the namespace changes
+        with mock.patch(PATCH_MODULE + ".send_message_to_gui"):
+            self.namespace.remove_pages([0])
+        self.namespace.data = {}
+        frames = self.namespace.get_sync_frames("qt5")
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(json.loads(frames[0])["data"], [])
+
+        # cached messages are never used with pages loaded after them, even
+        # before the sync cache is dropped
+        from ovos_gui.namespace import _PageState
+        self.namespace.pages = [page]
+        self.namespace.get_sync_frames("qt5")
+        other = GuiPage(name="baz", persistent=True, duration=0)
+        other.get_uri = Mock(return_value="baz_uri")
+        self.namespace._page_state = _PageState([page, other])
+        frames = self.namespace.get_sync_frames("qt5")
+        self.assertEqual(json.loads(frames[0])["data"],
+                         [{"url": "bar_uri", "page": "bar"},
+                          {"url": "baz_uri", "page": "baz"}])
+
     def test_get_position_of_last_item_in_data(self):
         # TODO
         pass
@@ -162,9 +274,70 @@ class TestNamespace(TestCase):
             send_message_mock.assert_called_with(load_page_message)
         self.assertListEqual(self.namespace.pages, self.namespace.pages)
 
+    def test_load_pages_duplicates(self):
+        self.namespace.pages = [GuiPage(name="foo", persistent=True, duration=0)]
+        new_pages = [GuiPage(name="bar", persistent=False, duration=30),
+                     GuiPage(name="foo", persistent=False, duration=30),
+                     GuiPage(name="bar", persistent=False, duration=30)]
+        with mock.patch(PATCH_MODULE + ".send_message_to_gui"):
+            self.namespace.load_pages(new_pages, 0)
+        # pages are only loaded once per name
+        self.assertListEqual(["foo", "bar"], self.namespace.page_names)
+
     def test_add_pages(self):
-        # TODO
-        pass
+        qt5_client = mock.Mock(framework="qt5")
+        qt5_client_2 = mock.Mock(framework="qt5")
+        qt6_client = mock.Mock(framework="qt6")
+        page = GuiPage(name="foo", persistent=True, duration=0,
+                       namespace="foo")
+        self.namespace.pages = [page]
+        with mock.patch("ovos_gui.bus.GUIWebsocketHandler") as handler:
+            handler.clients = [qt5_client, qt5_client_2, qt6_client]
+            self.namespace._add_pages([page])
+        # pages are serialized once per framework
+        qt5_payload = qt5_client.send_raw.call_args[0][0]
+        self.assertIs(qt5_client_2.send_raw.call_args[0][0], qt5_payload)
+        self.assertEqual(json.loads(qt5_payload), {
+            "type": "mycroft.gui.list.insert", "namespace": "foo",
+            "position": 0, "data": [{"url": page.get_uri("qt5"),
+                                     "page": "foo"}]})
+        self.assertEqual(json.loads(qt6_client.send_raw.call_args[0][0]),
+                         json.loads(build_pages_payload(
+                             serialize_pages([page], "qt6"), "foo", 0)))
+
+    def test_get_page_index(self):
+        self.namespace.pages = [GuiPage(name="foo", persistent=True, duration=0),
+                                GuiPage(name="bar", persistent=False, duration=30)]
+        self.assertEqual(self.namespace.get_page_index("foo"), 0)
+        self.assertEqual(self.namespace.get_page_index("bar"), 1)
+        self.assertIsNone(self.namespace.get_page_index("foobar"))
+        # the index follows page changes
+        with mock.patch(PATCH_MODULE + ".send_message_to_gui"):
+            self.namespace.remove_pages([0])
+        self.assertEqual(self.namespace.get_page_index("bar"), 0)
+        self.assertIsNone(self.namespace.get_page_index("foo"))
+
+    def test_focus_page(self):
+        self.namespace.pages = [GuiPage(name="foo", persistent=True, duration=0),
+                                GuiPage(name="bar", persistent=False, duration=30)]
+        self.namespace._page_state.urls = {"qt5": ["foo.qml", "bar.qml"]}
+        # focusing an unchanged page keeps resolved URIs
+        self.namespace.focus_page(
+            GuiPage(name="bar", persistent=False, duration=30))
+        self.assertEqual(self.namespace.page_number, 1)
+        self.assertIn("qt5", self.namespace._page_state.urls)
+
+        # an updated page replaces the loaded one
+        page = GuiPage(name="bar", persistent=True, duration=0)
+        self.namespace.focus_page(page)
+        self.assertIs(self.namespace.pages[1], page)
+        self.assertEqual(self.namespace._page_state.urls, {})
+
+        # a missing page is inserted first
+        page = GuiPage(name="foobar", persistent=True, duration=0)
+        self.namespace.focus_page(page)
+        self.assertEqual(self.namespace.page_number, 0)
+        self.assertEqual(["foobar", "foo", "bar"], self.namespace.page_names)
 
     def test_activate_page(self):
         # TODO
@@ -186,6 +359,17 @@ class TestNamespace(TestCase):
             send_message_mock.assert_called_with(remove_page_message)
         self.assertListEqual(["foo", "bar"], self.namespace.page_names)
 
+    def test_remove_pages_runs(self):
+        self.namespace.pages = [GuiPage(name=str(i), persistent=False,
+                                        duration=False) for i in range(6)]
+        with mock.patch(PATCH_MODULE + ".send_message_to_gui") as send:
+            self.namespace.remove_pages([1, 5, 3, 4])
+        # consecutive pages are removed together, last pages first
+        self.assertEqual(
+            [(c[0][0]["position"], c[0][0]["items_number"])
+             for c in send.call_args_list], [(3, 3), (1, 1)])
+        self.assertListEqual(["0", "2"], self.namespace.page_names)
+
     def test_page_gained_focus(self):
         # TODO
         pass
@@ -211,12 +395,67 @@ class TestNamespace(TestCase):
         pass
 
 
+class TestScheduler(TestCase):
+    def test_schedule(self):
+        from ovos_gui.namespace import _Scheduler
+        scheduler = _Scheduler()
+        calls = []
+        done = Event()
+        scheduler.schedule(0.1, done.set)
+        scheduler.schedule(0.05, calls.append, "second")
+        scheduler.schedule(0.01, calls.append, "first")
+        cancelled = scheduler.schedule(0.02, calls.append, "cancelled")
+        cancelled.cancel()
+        self.assertTrue(done.wait(1))
+        # calls run in order of their deadline, on a single thread
+        self.assertEqual(calls, ["first", "second"])
+        self.assertEqual(scheduler._heap, [])
+
+
 class TestNamespaceManager(TestCase):
     def setUp(self):
         from ovos_gui.namespace import NamespaceManager
         with mock.patch(PATCH_MODULE + ".create_gui_service"):
             self.namespace_manager = NamespaceManager(FakeBus())
 
+    @mock.patch(PATCH_MODULE + ".Configuration")
+    def test_handle_config_changes(self, config):
+        bus = self.namespace_manager.core_bus
+        bus.emit(Message("configuration.patch", {"config": {"gui": {
+            "idle_display_skill": "patched", "extension": "Bigscreen"}}}))
+        self.assertEqual(self.namespace_manager.idle_display_skill, "patched")
+        self.assertEqual(self.namespace_manager.active_extension, "bigscreen")
+        config.assert_not_called()
+
+        config.return_value = {"gui": {"idle_display_skill": "updated"}}
+        bus.emit(Message("configuration.updated"))
+        self.assertEqual(self.namespace_manager.idle_display_skill, "updated")
+        self.assertEqual(self.namespace_manager.active_extension, "generic")
+
+        config.return_value = {"gui": {"extension": "mobile"}}
+        bus.emit(Message("configuration.patch.clear"))
+        self.assertIsNone(self.namespace_manager.idle_display_skill)
+        self.assertEqual(self.namespace_manager.active_extension, "mobile")
+
+        # config files changed on disk don't emit a bus message
+        from ovos_gui.namespace import NamespaceManager
+        with mock.patch(PATCH_MODULE + ".create_gui_service"):
+            manager = NamespaceManager(FakeBus())
+        config.set_config_watcher.assert_called_once_with(
+            manager.handle_config_updated)
+        config.return_value = {"gui": {"idle_display_skill": "edited"}}
+        config.set_config_watcher.call_args[0][0]()
+        self.assertEqual(manager.idle_display_skill, "edited")
+
+    def test_get_active_position(self):
+        foo, bar = Namespace("foo"), Namespace("bar")
+        self.namespace_manager.active_namespaces = [foo, bar]
+        self.assertEqual(self.namespace_manager._get_active_position(foo), 0)
+        self.assertEqual(self.namespace_manager._get_active_position(bar), 1)
+        self.assertIsNone(
+            self.namespace_manager._get_active_position(Namespace("foo")))
+        self.assertIsNone(self.namespace_manager._get_active_position(None))
+
     def test_handle_clear_namespace_active(self):
         namespace = Namespace("foo")
         namespace.remove = mock.Mock()
@@ -307,8 +546,9 @@ class TestNamespaceManager(TestCase):
         self.namespace_manager._load_pages.assert_called_with(
             [GuiPage(name='bar', persistent=False, duration=10, namespace='foo'),
              GuiPage(name='test/baz', persistent=False, duration=10, namespace='foo')], 0)
+        # persistence is parsed once, the duration is set on the pages
         self.namespace_manager._update_namespace_persistence. \
-            assert_called_with(10)
+            assert_called_with(False)
 
         # With resource info
         ui_directories = {"gui": "/tmp/test"}
@@ -374,44 +614,200 @@ class TestNamespaceManager(TestCase):
         pass
 
     def test_update_namespace_persistence(self):
-        # TODO
-        pass
+        manager = self.namespace_manager
+        manager._schedule_namespace_removal = Mock()
+        active = Namespace("active")
+        kept = Namespace("kept")
+        kept.persistent = True
+        stale = [Namespace("stale1"), Namespace("stale2")]
+        for namespace in [active, kept] + stale:
+            namespace.remove = Mock()
+            manager.loaded_namespaces[namespace.skill_id] = namespace
+        manager.active_namespaces = [active] + stale + [kept]
+
+        # every non-persistent background namespace is removed
+        manager._update_namespace_persistence(False)
+        self.assertEqual(manager.active_namespaces, [active, kept])
+        self.assertFalse(active.persistent)
+        manager._schedule_namespace_removal.assert_called_once_with(active)
 
     def test_schedule_namespace_removal(self):
-        # TODO
-        pass
+        namespace = Namespace("foo")
+        namespace.duration = 0
+        removed = Event()
+        self.namespace_manager._remove_namespace_via_timer = \
+            lambda name: removed.set()
+        self.namespace_manager._schedule_namespace_removal(namespace)
+        self.assertIn("foo", self.namespace_manager.remove_namespace_timers)
+        self.assertTrue(removed.wait(1))
+
+        # removal is only scheduled once
+        namespace.duration = 10
+        self.namespace_manager.remove_namespace_timers = dict()
+        self.namespace_manager._schedule_namespace_removal(namespace)
+        timer = self.namespace_manager.remove_namespace_timers["foo"]
+        self.namespace_manager._schedule_namespace_removal(namespace)
+        self.assertIs(self.namespace_manager.remove_namespace_timers["foo"],
+                      timer)
+        timer.cancel()
 
     def test_remove_namespace_via_timer(self):
         # TODO
         pass
 
     def test_remove_namespace(self):
-        # TODO
-        pass
+        manager = self.namespace_manager
+        manager.active_namespaces = []
+        timer = Mock()
+        manager.remove_namespace_timers = {"foo": timer}
+        # the removal timer is cancelled and dropped once
+        manager._remove_namespace("foo")
+        timer.cancel.assert_called_once()
+        self.assertEqual(manager.remove_namespace_timers, {})
+        # removing again without a timer is a no-op
+        manager._remove_namespace("foo")
+        self.assertEqual(manager.remove_namespace_timers, {})
 
     def test_emit_namespace_displayed_event(self):
-        # TODO
-        pass
+        displayed = []
+        done = Event()
+
+        def _on_displayed(message):
+            displayed.append(message.data)
+            done.set()
+
+        self.namespace_manager.core_bus.on("gui.namespace.displayed",
+                                           _on_displayed)
+        self.namespace_manager.active_namespaces = []
+        self.namespace_manager._emit_namespace_displayed_event()
+        self.namespace_manager.active_namespaces = [Namespace("foo"),
+                                                    Namespace("bar")]
+        self.namespace_manager._emit_namespace_displayed_event()
+        # emitted from the background emitter thread
+        self.assertTrue(done.wait(1))
+        self.assertEqual(displayed, [{"skill_id": "foo"}])
 
     def test_handle_status_request(self):
         # TODO
         pass
 
     def test_handle_set_value(self):
-        # TODO
-        pass
+        from ovos_gui.namespace import namespace_lock
+        message = Message("gui.value.set", {"__from": "foo", "bar": 1})
+        # updates don't wait for unrelated namespace stack changes
+        with namespace_lock:
+            self.namespace_manager.handle_set_value(message)
+        self.assertEqual(
+            self.namespace_manager.loaded_namespaces["foo"].data,
+            {"bar": 1})
+        # but do wait for changes to the same namespace
+        lock = self.namespace_manager._get_namespace_lock("foo")
+        self.assertIs(self.namespace_manager._get_namespace_lock("foo"), lock)
+        self.assertIsNot(self.namespace_manager._get_namespace_lock("bar"),
+                         lock)
+
+    def test_handle_set_value_during_show_page(self):
+        manager = self.namespace_manager
+        namespace = Namespace("foo")
+        namespace.data = {"k": "old"}
+        manager.loaded_namespaces = {"foo": namespace}
+        manager.active_namespaces = []
+        manager._update_namespace_persistence = Mock()
+        sent = []
+        client = Mock(framework="qt5")
+        client.send_raw.side_effect = \
+            lambda payload: sent.append(json.loads(payload))
+        client.send_batch.side_effect = \
+            lambda payloads: sent.extend(json.loads(p) for p in payloads)
+        set_value = Thread(target=manager.handle_set_value, args=(
+            Message("gui.value.set", {"__from": "foo", "k": "new"}),))
+
+        def _load_pages(*args):
+            # the namespace is active, its messages are not sent yet
+            set_value.start()
+            set_value.join(0.1)
+            self.assertTrue(set_value.is_alive())
+
+        manager._load_pages = Mock(side_effect=_load_pages)
+        with mock.patch("ovos_gui.bus.GUIWebsocketHandler") as handler:
+            handler.clients = [client]
+            manager.handle_show_page(Message("gui.page.show", {
+                "__from": "foo", "__idle": True, "page_names": ["page"]}))
+            set_value.join(1)
+        values = [m["data"] for m in sent
+                  if m["type"] == "mycroft.session.set"]
+        # the update is sent after the namespace and its old data
+        self.assertEqual(sent[0]["type"], "mycroft.session.list.insert")
+        self.assertEqual(values, [{"k": "old"}, {"k": "new"}])
+        self.assertEqual(namespace.data, {"k": "new"})
 
     def test_update_namespace_data(self):
-        # TODO
-        pass
+        namespace = Namespace("foo")
+        namespace.data = {"unchanged": 1}
+        namespace.load_data_items = Mock()
+        self.namespace_manager.loaded_namespaces = {"foo": namespace}
+        self.namespace_manager.active_namespaces = [namespace]
+        self.namespace_manager._update_namespace_data(
+            "foo", {"__from": "foo", "unchanged": 1, "changed": 2,
+                    "added": 3})
+        self.assertEqual(namespace.data,
+                         {"unchanged": 1, "changed": 2, "added": 3})
+        # changed attributes are sent in one message
+        namespace.load_data_items.assert_called_once_with(
+            {"changed": 2, "added": 3})
+
+        # nothing is sent when no value changes
+        namespace._sync_cache = {"qt5": []}
+        namespace.load_data_items.reset_mock()
+        self.namespace_manager._update_namespace_data(
+            "foo", {"__from": "foo", "changed": 2})
+        namespace.load_data_items.assert_not_called()
+        self.assertEqual(namespace._sync_cache, {"qt5": []})
+
+        # inactive namespaces are synced when activated
+        self.namespace_manager.active_namespaces = []
+        self.namespace_manager._update_namespace_data(
+            "foo", {"__from": "foo", "changed": 4})
+        self.assertEqual(namespace.data["changed"], 4)
+        namespace.load_data_items.assert_not_called()
 
     def test_handle_client_connected(self):
         # TODO
         pass
 
     def test_handle_page_interaction(self):
-        # TODO
-        pass
+        manager = self.namespace_manager
+        manager._schedule_namespace_removal = Mock()
+        namespace = Namespace("foo")
+        manager.loaded_namespaces = {"foo": namespace}
+
+        # unknown namespaces and unscheduled removals are ignored
+        manager.handle_page_interaction(
+            Message("gui.page_interaction", {"skill_id": "bar"}))
+        manager.handle_page_interaction(
+            Message("gui.page_interaction", {"skill_id": "foo"}))
+        manager._schedule_namespace_removal.assert_not_called()
+
+        # a scheduled removal is restarted
+        timer = Mock()
+        manager.remove_namespace_timers = {"foo": timer}
+        manager.handle_page_interaction(
+            Message("gui.page_interaction", {"skill_id": "foo"}))
+        timer.cancel.assert_called_once()
+        self.assertNotIn("foo", manager.remove_namespace_timers)
+        manager._schedule_namespace_removal.assert_called_once_with(namespace)
+
+        # persistent namespaces only update the focused page
+        namespace.persistent = True
+        namespace.page_gained_focus = Mock()
+        timer = Mock()
+        manager.remove_namespace_timers = {"foo": timer}
+        manager.handle_page_interaction(
+            Message("gui.page_interaction",
+                    {"skill_id": "foo", "page_number": 1}))
+        namespace.page_gained_focus.assert_called_once_with(1)
+        timer.cancel.assert_not_called()
+        self.assertIs(manager.remove_namespace_timers["foo"], timer)
 
     def test_handle_page_gained_focus(self):
         # TODO
@@ -421,10 +817,6 @@ class TestNamespaceManager(TestCase):
         # TODO
         pass
 
-    def test_del_namespace_in_remove_timers(self):
-        # TODO
-        pass
-
     def test_upload_system_resources(self):
         p = f"{GUI_CACHE_PATH}/system"
         rmtree(p)
@@ -435,6 +827,15 @@ class TestNamespaceManager(TestCase):
         # Test repeated copy doesn't raise any exception
         self.namespace_manager._cache_system_resources()
         self.assertTrue(isdir(join(p, "qt5")))
+        self.assertTrue(isfile(join(p, "qt5",
+                                    "SYSTEM_TextFrame.qml")))
+        # Unchanged resources are not copied again
+        with mock.patch(PATCH_MODULE + ".shutil") as shutil_mock:
+            self.namespace_manager._cache_system_resources()
+            shutil_mock.copytree.assert_not_called()
+        # Modified resources are replaced
+        remove(join(p, "qt5", "SYSTEM_TextFrame.qml"))
+        self.namespace_manager._cache_system_resources()
         self.assertTrue(isfile(join(p, "qt5",
                                     "SYSTEM_TextFrame.qml")))
         rmtree(p)
@@ -0,0 +1,12 @@
+import unittest
+
+
+class TestUtils(unittest.TestCase):
+    def test_is_debug_enabled(self):
+        from ovos_gui.utils import is_debug_enabled, LOG
+        real_level = LOG.level
+        for level, enabled in (("DEBUG", True), ("debug", True),
+                               ("INFO", False), (10, True), (20, False)):
+            LOG.level = level
+            self.assertEqual(is_debug_enabled(), enabled, level)
+        LOG.level = real_level